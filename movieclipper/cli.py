@@ -7,34 +7,98 @@ configurable audio handling.
 from __future__ import annotations
 
 import errno
+import heapq
 import json
 import os
 import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from decimal import Decimal
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import click
-import toml
+import tomli_w
 from pydantic import BaseModel, ValidationError, field_validator
-from rapidfuzz import fuzz
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.prompt import Confirm, Prompt
-from rich.table import Table
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Only the console is needed on every run. Modules used by a single code path
+# (rapidfuzz, rich.table, rich.progress) are imported where they are used to
+# keep quick commands such as --cache-info and --help fast to start.
 console = Console()
 
 # Accepts Decimal for precise arithmetic, float/int for convenience when calling
 # from external code or tests.
 TimeSeconds = Decimal | float | int
 
+# Release details (year, source, codec) trailing a movie title in a file name.
+# Applied in order, each pattern drops everything from its match onwards.
+_RELEASE_SUFFIX_PATTERNS = (
+    re.compile(r"\.(19|20)\d{2}\..*"),
+    re.compile(r"\.(BluRay|WEB|HDTV|DVDRip)\..*", re.IGNORECASE),
+    re.compile(r"\.x26[45].*", re.IGNORECASE),
+)
+
+# Bump when the movie index cache layout changes so old caches are rebuilt.
+CACHE_VERSION = 5
+
+# Word separators in release names ("Iron.Man.2008", "Iron_Man"), matched as spaces.
+_SEARCH_SEPARATORS = re.compile(r"[._\s]+")
+
+# Minimum fuzzy match score (0-100) for a movie to be offered as a match.
+MATCH_THRESHOLD = 60
+
+# Number of concurrent stat() calls when building the movie index.
+STAT_WORKERS = 32
+
+# Directories already created by _ensure_dir during this process.
+_ensured_dirs: set[Path] = set()
+
+# Video encoder used by --reencode for frame-accurate cuts.
+REENCODE_VIDEO_CODEC = "libx264"
+
+# Hardware H.264 encoders selectable with --encoder; "auto" tries them in order.
+HARDWARE_ENCODERS = {
+    "nvenc": "h264_nvenc",
+    "videotoolbox": "h264_videotoolbox",
+    "vaapi": "h264_vaapi",
+    "qsv": "h264_qsv",
+}
+
+# Render node used to upload frames for h264_vaapi.
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+# Seconds prefetched before each clip start, covering the keyframe ffmpeg seeks to.
+PREFETCH_LEAD_SECONDS = 10
+
+# Most clips cut by one ffmpeg; each clip is a separate demuxer and encoder.
+MAX_CLIPS_PER_COMMAND = 8
+
+# Number of trailing ffmpeg log lines shown when a clip fails.
+FFMPEG_LOG_LINES = 64
+
+# Position reported in ffmpeg's status line, e.g. "time=00:01:02.50".
+_FFMPEG_TIME_PATTERN = re.compile(r"time=(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
 
 @dataclass(frozen=True)
 class FfmpegTools:
@@ -42,6 +106,34 @@ class FfmpegTools:
     ffprobe: Optional[Path]
 
 
+@dataclass(frozen=True)
+class MovieIndex:
+    """Movie files with the normalized names used for fuzzy matching."""
+
+    paths: List[Path]
+    stems: List[str]
+    # Folder names are None when they match the folder above them.
+    parents: List[Optional[str]]
+
+    @classmethod
+    def from_paths(cls, paths: List[Path]) -> MovieIndex:
+        keys = [movie_search_keys(path) for path in paths]
+        return cls(
+            paths=paths,
+            stems=[stem for stem, _ in keys],
+            parents=[parent for _, parent in keys],
+        )
+
+
+@dataclass(frozen=True)
+class ClipSegment:
+    """One clip requested through a --segments manifest."""
+
+    start_seconds: Decimal
+    duration_seconds: Decimal
+    name: Optional[str] = None
+
+
 class DirectoryConfig(BaseModel):
     """Configuration for movie and clip directories."""
 
@@ -104,9 +196,6 @@ class Config(BaseModel):
     settings: Settings = Settings()
 
 
-config: Optional[Config] = None
-
-
 def get_config_path() -> Path:
     """Get the path to the configuration file."""
     config_dir = Path.home() / ".config" / "movieclipper"
@@ -114,30 +203,25 @@ def get_config_path() -> Path:
 
 
 def read_config(config_path: Path) -> Config:
-    with config_path.open("r", encoding="utf-8") as handle:
-        config_data = toml.load(handle)
+    with config_path.open("rb") as handle:
+        config_data = tomllib.load(handle)
     return Config(**config_data)
 
 
+@lru_cache(maxsize=1)
 def load_config() -> Config:
     """Load configuration from file or create default."""
-    global config
-    if config is not None:
-        return config
-
     config_path = get_config_path()
 
     if not config_path.exists():
-        config = setup_config()
-    else:
-        try:
-            config = read_config(config_path)
-        except (ValidationError, FileNotFoundError, toml.TomlDecodeError) as exc:
-            console.print(f"[red]Error loading config: {exc}[/red]")
-            console.print("[yellow]Running setup again...[/yellow]")
-            config = setup_config()
+        return setup_config()
 
-    return config
+    try:
+        return read_config(config_path)
+    except (ValidationError, FileNotFoundError, tomllib.TOMLDecodeError) as exc:
+        console.print(f"[red]Error loading config: {exc}[/red]")
+        console.print("[yellow]Running setup again...[/yellow]")
+        return setup_config()
 
 
 def default_directories() -> Tuple[Path, Path]:
@@ -199,41 +283,50 @@ def save_config(config_value: Config) -> None:
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
 
+    settings_data = {
+        "default_audio_codec": config_value.settings.default_audio_codec,
+        "default_sample_rate": config_value.settings.default_sample_rate,
+        "default_audio_channels": config_value.settings.default_audio_channels,
+        "default_audio_language": config_value.settings.default_audio_language,
+        "preserve_all_audio": config_value.settings.preserve_all_audio,
+        "preview_by_default": config_value.settings.preview_by_default,
+        "follow_symlinks": config_value.settings.follow_symlinks,
+        "video_extensions": config_value.settings.video_extensions,
+        "cache_enabled": config_value.settings.cache_enabled,
+        "cache_ttl_hours": config_value.settings.cache_ttl_hours,
+        "cache_location": config_value.settings.cache_location,
+    }
     config_data = {
         "directories": {
             "movies_dir": str(config_value.directories.movies_dir),
             "clips_dir": str(config_value.directories.clips_dir),
         },
-        "settings": {
-            "default_audio_codec": config_value.settings.default_audio_codec,
-            "default_sample_rate": config_value.settings.default_sample_rate,
-            "default_audio_channels": config_value.settings.default_audio_channels,
-            "default_audio_language": config_value.settings.default_audio_language,
-            "preserve_all_audio": config_value.settings.preserve_all_audio,
-            "preview_by_default": config_value.settings.preview_by_default,
-            "follow_symlinks": config_value.settings.follow_symlinks,
-            "video_extensions": config_value.settings.video_extensions,
-            "cache_enabled": config_value.settings.cache_enabled,
-            "cache_ttl_hours": config_value.settings.cache_ttl_hours,
-            "cache_location": config_value.settings.cache_location,
-        },
+        # TOML has no null value; unset settings are omitted and fall back to
+        # their defaults when the file is read back.
+        "settings": {key: value for key, value in settings_data.items() if value is not None},
     }
 
-    with config_path.open("w", encoding="utf-8") as handle:
-        toml.dump(config_data, handle)
+    with config_path.open("wb") as handle:
+        tomli_w.dump(config_data, handle)
 
 
 def get_cache_path(config_value: Optional[Config] = None) -> Path:
     """Get the path to the movie index cache file."""
     if config_value is None:
         config_value = load_config()
+    return _cache_path_for(config_value.settings.cache_location, Path.home())
+
 
-    if config_value.settings.cache_location:
-        cache_dir = Path(config_value.settings.cache_location).expanduser()
+@lru_cache(maxsize=2)
+def _cache_path_for(cache_location: Optional[str], home: Path) -> Path:
+    # Resolved once per location: the legacy-path probe and mkdir only need to
+    # happen the first time a command asks for the cache file.
+    if cache_location:
+        cache_dir = Path(cache_location).expanduser()
     else:
         # Migration: use old path if new path doesn't exist but old path does
-        new_cache_dir = Path.home() / ".cache" / "movieclipper"
-        old_cache_dir = Path.home() / ".cache" / "movie_clipper"
+        new_cache_dir = home / ".cache" / "movieclipper"
+        old_cache_dir = home / ".cache" / "movie_clipper"
         new_cache_path = new_cache_dir / "movie_index.json"
         old_cache_path = old_cache_dir / "movie_index.json"
 
@@ -246,40 +339,67 @@ def get_cache_path(config_value: Optional[Config] = None) -> Path:
     return cache_dir / "movie_index.json"
 
 
-def load_movie_cache() -> Optional[Dict[str, Any]]:
+def _json_loads(data: bytes) -> Any:
+    # orjson (the "fast" extra) parses large indexes several times faster.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def load_movie_cache(config_value: Optional[Config] = None) -> Optional[Dict[str, Any]]:
     """Load movie index cache from file."""
-    cache_path = get_cache_path()
+    cache_path = get_cache_path(config_value)
 
     if not cache_path.exists():
         return None
 
     try:
-        with cache_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
-    except (json.JSONDecodeError, FileNotFoundError, OSError):
+        return _json_loads(cache_path.read_bytes())
+    except (ValueError, OSError):
         return None
 
 
 def save_movie_cache(cache_data: Dict[str, Any], config_value: Optional[Config] = None) -> None:
     """Save movie index cache to file."""
     cache_path = get_cache_path(config_value)
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
 
     try:
-        with cache_path.open("w", encoding="utf-8") as handle:
-            json.dump(cache_data, handle, indent=2)
+        # Write compact JSON to a temporary file and swap it in, so readers never
+        # see a partially written index.
+        temp_path.write_bytes(_json_dumps(cache_data))
+        os.replace(temp_path, cache_path)
     except (OSError, IOError) as exc:
         console.print(f"[yellow]Warning: Could not save cache: {exc}[/yellow]")
 
 
-def is_cache_valid(cache_data: Dict[str, Any], movies_dir: Path, config_value: Config) -> bool:
+def is_cache_valid(
+    cache_data: Dict[str, Any], movies_dir: Path, config_value: Config, check_age: bool = True
+) -> bool:
     """Check if cached movie index is still valid."""
     if not cache_data:
         return False
 
-    required_keys = {"timestamp", "movies_dir", "movies", "extensions", "follow_symlinks"}
+    required_keys = {
+        "timestamp",
+        "movies_dir",
+        "movies",
+        "directories",
+        "extensions",
+        "follow_symlinks",
+    }
     if not required_keys.issubset(cache_data.keys()):
         return False
 
+    if cache_data.get("version") != CACHE_VERSION:
+        return False
+
     if cache_data["movies_dir"] != str(movies_dir):
         return False
 
@@ -290,16 +410,41 @@ def is_cache_valid(cache_data: Dict[str, Any], movies_dir: Path, config_value: C
         return False
 
     cache_age_hours = (time.time() - cache_data["timestamp"]) / 3600
-    if cache_age_hours > config_value.settings.cache_ttl_hours:
+    if check_age and cache_age_hours > config_value.settings.cache_ttl_hours:
         return False
 
     return True
 
 
-def iter_movie_files(movies_dir: Path, extensions: List[str], follow_symlinks: bool) -> List[Path]:
-    """Return movie files from a directory tree."""
-    extensions_lower = {ext.lower() for ext in extensions}
-    movie_files: List[Path] = []
+def _directory_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _directories_unchanged(cache_data: Dict[str, Any]) -> bool:
+    """Check whether no directory in the cached library gained, lost or renamed entries."""
+    # A directory's mtime changes whenever an entry inside it is added, removed
+    # or renamed, so one stat() per directory replaces listing the whole tree.
+    directories = cache_data["directories"]
+    with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+        mtimes = list(executor.map(_directory_mtime, directories["paths"]))
+    return mtimes == directories["mtimes"]
+
+
+def _scan_movie_entries(
+    movies_dir: Path,
+    extensions: List[str],
+    follow_symlinks: bool,
+    directory_mtimes: Optional[Dict[str, Optional[int]]] = None,
+) -> Iterator[os.DirEntry]:
+    """Yield directory entries for movie files in a directory tree.
+
+    When ``directory_mtimes`` is given, it is filled with the mtime of every
+    directory that was listed, and with None for directories that could not be.
+    """
+    suffixes = tuple(ext.lower() for ext in extensions)
     warned_errors: set[tuple[int | None, str | None]] = set()
 
     def handle_walk_error(error: OSError) -> None:
@@ -313,18 +458,101 @@ def iter_movie_files(movies_dir: Path, extensions: List[str], follow_symlinks: b
         location = error.filename or "unknown path"
         console.print(f"[yellow]Warning:[/yellow] Permission denied while scanning {location}")
 
-    for root, _, files in os.walk(
-        movies_dir, followlinks=follow_symlinks, onerror=handle_walk_error
-    ):
-        for name in files:
-            path = Path(root) / name
-            if path.suffix.lower() in extensions_lower:
-                # Skip symlinked files when follow_symlinks is False
-                if not follow_symlinks and path.is_symlink():
-                    continue
-                movie_files.append(path)
+    # Directories already queued, by (device, inode), so symlink loops and links
+    # to another part of the library are only walked once.
+    visited: set[tuple[int, int]] = set()
+    if follow_symlinks:
+        try:
+            root_stat = movies_dir.stat()
+        except OSError:
+            pass
+        else:
+            visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    stack = [os.fspath(movies_dir)]
+    while stack:
+        directory = stack.pop()
+        # Taken before listing, so entries added during the scan show up as a
+        # changed directory next time.
+        mtime = _directory_mtime(directory) if directory_mtimes is not None else None
+        try:
+            scanner = os.scandir(directory)
+        except OSError as exc:
+            handle_walk_error(exc)
+            # chmod leaves the mtime alone, so an unlistable directory is recorded
+            # as None: it never matches a later stat() and forces a full rescan.
+            if directory_mtimes is not None:
+                directory_mtimes[directory] = None
+            continue
+        if directory_mtimes is not None and mtime is not None:
+            directory_mtimes[directory] = mtime
+
+        with scanner:
+            try:
+                for entry in scanner:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        if follow_symlinks:
+                            try:
+                                dir_stat = entry.stat()
+                            except OSError:
+                                continue
+                            key = (dir_stat.st_dev, dir_stat.st_ino)
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                            stack.append(entry.path)
+                        elif not entry.is_symlink():
+                            stack.append(entry.path)
+                        continue
+
+                    # A single endswith() call tests every extension at once. A bare
+                    # ".mkv" is a hidden file without an extension, as with Path.suffix.
+                    name = entry.name.lower()
+                    if not name.endswith(suffixes) or name in suffixes:
+                        continue
+                    # Skip symlinked files when follow_symlinks is False
+                    if not follow_symlinks and entry.is_symlink():
+                        continue
+                    yield entry
+            except OSError as exc:
+                handle_walk_error(exc)
+                if directory_mtimes is not None:
+                    directory_mtimes[directory] = None
+
+
+def _search_key(name: str) -> str:
+    """Normalize a name or query for fuzzy matching."""
+    return _SEARCH_SEPARATORS.sub(" ", name).strip().lower()
 
-    return sorted(movie_files)
+
+def movie_search_keys(movie_file: Path) -> Tuple[str, Optional[str]]:
+    """Return the normalized stem and folder name matched against queries."""
+    parent = movie_file.parent
+    parent_key = _search_key(parent.name) if parent.name != parent.parent.name else None
+    return _search_key(movie_file.stem), parent_key
+
+
+def _stat_movie_entry(entry: os.DirEntry) -> Optional[Tuple[str, int, float, str, Optional[str]]]:
+    """Return a cache row for a movie entry, or None if it cannot be stat'ed."""
+    try:
+        stat = entry.stat()
+    except OSError:
+        return None
+    stem, parent = movie_search_keys(Path(entry.path))
+    return entry.path, stat.st_size, stat.st_mtime, stem, parent
+
+
+def iter_movie_files(
+    movies_dir: Path, extensions: List[str], follow_symlinks: bool
+) -> Iterator[Path]:
+    """Yield movie files from a directory tree, in scan order."""
+    for entry in _scan_movie_entries(movies_dir, extensions, follow_symlinks):
+        yield Path(entry.path)
 
 
 def build_movie_cache(
@@ -333,35 +561,53 @@ def build_movie_cache(
     """Build movie index cache by scanning directory."""
     console.print("[blue]Building movie index cache...[/blue]")
 
-    movie_files = []
-    for path in iter_movie_files(movies_dir, extensions, follow_symlinks):
-        try:
-            stat = path.stat()
-            movie_files.append(
-                {
-                    "path": str(path),
-                    "size": stat.st_size,
-                    "mtime": stat.st_mtime,
-                }
-            )
-        except OSError:
-            continue
+    directory_mtimes: Dict[str, Optional[int]] = {}
+    entries = _scan_movie_entries(movies_dir, extensions, follow_symlinks, directory_mtimes)
+    # stat() releases the GIL, so overlapping calls hides per-file latency on
+    # network filesystems.
+    with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+        rows = [row for row in executor.map(_stat_movie_entry, entries) if row]
+
+    # Stored as parallel columns rather than one object per file, which keeps
+    # the field names out of every entry and halves the size of the JSON.
+    paths, sizes, mtimes, stems, parents = (
+        (list(column) for column in zip(*rows)) if rows else ([], [], [], [], [])
+    )
 
     cache_data = {
+        "version": CACHE_VERSION,
         "timestamp": time.time(),
         "movies_dir": str(movies_dir),
         "follow_symlinks": follow_symlinks,
         "extensions": extensions,
-        "movies": movie_files,
+        "movies": {
+            "paths": paths,
+            "sizes": sizes,
+            "mtimes": mtimes,
+            "stems": stems,
+            "parents": parents,
+        },
+        "directories": {
+            "paths": list(directory_mtimes),
+            "mtimes": list(directory_mtimes.values()),
+        },
     }
 
-    console.print(f"[green]Found {len(movie_files)} movies in cache[/green]")
+    console.print(f"[green]Found {len(paths)} movies in cache[/green]")
     return cache_data
 
 
 def invalidate_movie_cache() -> None:
-    """Invalidate the movie index cache."""
+    """Invalidate the movie index cache and the ffprobe cache."""
     cache_path = get_cache_path()
+    probe_cache_path = _probe_cache_path()
+
+    if probe_cache_path.exists():
+        try:
+            probe_cache_path.unlink()
+            console.print("[green]ffprobe cache cleared[/green]")
+        except OSError as exc:
+            console.print(f"[yellow]Warning: Could not clear ffprobe cache: {exc}[/yellow]")
 
     if cache_path.exists():
         try:
@@ -380,66 +626,124 @@ def get_cache_info() -> Dict[str, Any]:
     if not cache_path.exists():
         return {"exists": False}
 
-    try:
-        cache_data = load_movie_cache()
-        if not cache_data:
-            return {"exists": False}
-
-        cache_age_hours = (time.time() - cache_data["timestamp"]) / 3600
+    outdated = {"exists": True, "outdated": True, "path": str(cache_path)}
+    cache_data = load_movie_cache()
+    # Unreadable files and indexes written by older releases (whose "movies" was
+    # a list of entries) are still on disk; they are replaced on the next search.
+    if (
+        not isinstance(cache_data, dict)
+        or cache_data.get("version") != CACHE_VERSION
+        or not isinstance(cache_data.get("movies"), dict)
+    ):
+        return outdated
 
+    try:
         return {
             "exists": True,
+            "outdated": False,
             "path": str(cache_path),
-            "movies_count": len(cache_data.get("movies", [])),
-            "age_hours": cache_age_hours,
+            "movies_count": len(cache_data["movies"]["paths"]),
+            "age_hours": (time.time() - cache_data["timestamp"]) / 3600,
             "movies_dir": cache_data.get("movies_dir", "unknown"),
             "size_bytes": cache_path.stat().st_size,
         }
-    except Exception:
-        return {"exists": False}
+    except (KeyError, TypeError, OSError):
+        return outdated
 
 
-def find_movie_files(
+def _movie_index_from_cache(cache_data: Dict[str, Any]) -> MovieIndex:
+    movies = cache_data["movies"]
+    return MovieIndex(
+        paths=[Path(path) for path in movies["paths"]],
+        stems=movies["stems"],
+        parents=movies["parents"],
+    )
+
+
+def find_movie_index(
     movies_dir: Path,
     extensions: List[str],
     follow_symlinks: bool = True,
     config_value: Optional[Config] = None,
-) -> List[Path]:
-    """Find all movie files in the directory and subdirectories."""
+) -> MovieIndex:
+    """Find all movie files along with their fuzzy matching keys."""
     if config_value is None:
         config_value = load_config()
 
     if config_value.settings.cache_enabled:
-        cache_data = load_movie_cache()
-        if cache_data and is_cache_valid(cache_data, movies_dir, config_value):
-            console.print("[blue]Using cached movie index[/blue]")
-            movie_paths = [Path(info["path"]) for info in cache_data["movies"]]
-            existing_paths = [path for path in movie_paths if path.exists()]
-            return sorted(existing_paths)
+        cache_data = load_movie_cache(config_value)
+        if cache_data and is_cache_valid(cache_data, movies_dir, config_value, check_age=False):
+            if is_cache_valid(cache_data, movies_dir, config_value):
+                console.print("[blue]Using cached movie index[/blue]")
+                # Entries are not checked for existence here; select_movie_file only
+                # checks the candidates that match the query.
+                return _movie_index_from_cache(cache_data)
+            if _directories_unchanged(cache_data):
+                # The expired index still lists every movie, so it is kept for
+                # another cache_ttl_hours instead of rescanning the library.
+                cache_data["timestamp"] = time.time()
+                save_movie_cache(cache_data, config_value)
+                console.print("[blue]Using cached movie index (library unchanged)[/blue]")
+                return _movie_index_from_cache(cache_data)
 
         cache_data = build_movie_cache(movies_dir, extensions, follow_symlinks)
         save_movie_cache(cache_data, config_value)
-        return [Path(info["path"]) for info in cache_data["movies"]]
-
-    return iter_movie_files(movies_dir, extensions, follow_symlinks)
+        return _movie_index_from_cache(cache_data)
 
+    return MovieIndex.from_paths(list(iter_movie_files(movies_dir, extensions, follow_symlinks)))
 
-def fuzzy_match_movie(query: str, movie_files: List[Path]) -> List[Tuple[Path, float]]:
-    """Find movies matching the query using fuzzy matching."""
-    matches = []
 
-    for movie_file in movie_files:
-        filename = movie_file.stem
-        score = fuzz.partial_ratio(query.lower(), filename.lower())
+def find_movie_files(
+    movies_dir: Path,
+    extensions: List[str],
+    follow_symlinks: bool = True,
+    config_value: Optional[Config] = None,
+) -> List[Path]:
+    """Find all movie files in the directory and subdirectories."""
+    return find_movie_index(movies_dir, extensions, follow_symlinks, config_value).paths
 
-        if movie_file.parent.name != movie_file.parent.parent.name:
-            parent_score = fuzz.partial_ratio(query.lower(), movie_file.parent.name.lower())
-            score = max(score, parent_score)
 
-        if score > 60:
-            matches.append((movie_file, score))
+def fuzzy_match_movie(query: str, movie_files: List[Path] | MovieIndex) -> List[Tuple[Path, float]]:
+    """Find movies matching the query using fuzzy matching."""
+    from rapidfuzz import fuzz, process
+
+    if not isinstance(movie_files, MovieIndex):
+        movie_files = MovieIndex.from_paths(movie_files)
+    query_key = _search_key(query)
+    stems = movie_files.stems
+    # Collections and extras folders hold many files, so each distinct folder
+    # name is scored once and the score is shared by every file inside it.
+    parent_positions: Dict[str, List[int]] = {}
+    for position, parent in enumerate(movie_files.parents):
+        if parent is not None:
+            parent_positions.setdefault(parent, []).append(position)
+
+    # Score every name in a single rapidfuzz call per list instead of one call
+    # per file. The cutoff lets rapidfuzz stop early on names that cannot reach
+    # the threshold.
+    scores = [0.0] * len(stems)
+    for _, score, position in process.extract(
+        query_key, stems, scorer=fuzz.partial_ratio, score_cutoff=MATCH_THRESHOLD, limit=None
+    ):
+        scores[position] = score
+    for parent, score, _ in process.extract(
+        query_key,
+        list(parent_positions),
+        scorer=fuzz.partial_ratio,
+        score_cutoff=MATCH_THRESHOLD,
+        limit=None,
+    ):
+        for position in parent_positions[parent]:
+            scores[position] = max(scores[position], score)
 
-    matches.sort(key=lambda item: item[1], reverse=True)
+    matches = [
+        (movie_file, score)
+        for movie_file, score in zip(movie_files.paths, scores)
+        if score > MATCH_THRESHOLD
+    ]
+    # The library is kept in scan order, so equal scores are ordered by path to
+    # keep the ranking stable between runs.
+    matches.sort(key=lambda item: (-item[1], os.fspath(item[0])))
     return matches
 
 
@@ -452,29 +756,36 @@ def select_movie_file(query: str, config_value: Optional[Config] = None) -> Path
     if query_path.exists() and query_path.is_file():
         return query_path
 
-    movie_files = find_movie_files(
+    movie_index = find_movie_index(
         config_value.directories.movies_dir,
         config_value.settings.video_extensions,
         config_value.settings.follow_symlinks,
         config_value,
     )
+    movie_files = movie_index.paths
 
     if not movie_files:
         console.print("[red]No movie files found in the movies directory.[/red]")
         sys.exit(1)
 
-    matches = fuzzy_match_movie(query, movie_files)
+    matches = fuzzy_match_movie(query, movie_index)
+    # Cached indexes may list files deleted since the last scan.
+    matches = [(movie_file, score) for movie_file, score in matches if movie_file.exists()]
 
     if not matches:
         console.print(f"[red]No movies found matching '{query}'[/red]")
-        console.print("\nAvailable movies:")
-        for movie_file in movie_files[:10]:
-            console.print(f"  - {movie_file.stem}")
+        # Only the listed names need ordering, not the whole library.
+        listed = heapq.nsmallest(10, movie_files, key=os.fspath)
+        console.print(
+            "\nAvailable movies:\n" + "\n".join(f"  - {movie_file.stem}" for movie_file in listed)
+        )
         sys.exit(1)
 
     if len(matches) == 1 or matches[0][1] > 90:
         return matches[0][0]
 
+    from rich.table import Table
+
     console.print(f"\n[yellow]Multiple movies found for '{query}':[/yellow]")
 
     table = Table(show_header=True, header_style="bold magenta")
@@ -505,6 +816,7 @@ def select_movie_file(query: str, config_value: Optional[Config] = None) -> Path
             console.print("[red]Please enter a number.[/red]")
 
 
+@lru_cache(maxsize=1024)
 def parse_time(time_str: str) -> Decimal:
     """Parse time string into seconds as a Decimal."""
     parts = [part.strip() for part in time_str.split(":")]
@@ -512,10 +824,19 @@ def parse_time(time_str: str) -> Decimal:
         raise ValueError(f"Invalid time format: {time_str}")
 
     def parse_component(part: str, allow_fraction: bool) -> Decimal:
-        # The `-?` prefix matches negative values here so they can be rejected
+        # A leading minus is accepted here so negative values can be rejected
         # later with a clear error message rather than failing silently.
-        pattern = r"-?(?:\d+(?:\.\d*)?|\.\d+)" if allow_fraction else r"-?\d+"
-        if not re.fullmatch(pattern, part):
+        digits = part[1:] if part.startswith("-") else part
+        if allow_fraction:
+            whole, _, fraction = digits.partition(".")
+            valid = (
+                bool(whole or fraction)
+                and (not whole or whole.isdecimal())
+                and (not fraction or fraction.isdecimal())
+            )
+        else:
+            valid = digits.isdecimal()
+        if not valid:
             raise ValueError(f"Invalid time format: {time_str}")
         return Decimal(part)
 
@@ -541,8 +862,12 @@ def parse_time(time_str: str) -> Decimal:
     return total_seconds
 
 
-def format_time(seconds: TimeSeconds) -> str:
-    """Format seconds into HH:MM:SS, preserving fractional seconds."""
+# Cached: the same boundaries are formatted for the summary, the ffmpeg command
+# and the file name. Equal numbers (1, 1.0, Decimal("1.0")) share an entry,
+# which is safe because the result only depends on the value.
+@lru_cache(maxsize=1024)
+def _split_time(seconds: TimeSeconds) -> Tuple[int, int, str]:
+    """Split seconds into hours, minutes and a zero-padded seconds string."""
     # Quantize to microsecond precision to avoid float artifacts like 0.30000000000000004
     total_seconds = Decimal(str(seconds)).quantize(Decimal("0.000001"))
     hours = int(total_seconds // Decimal("3600"))
@@ -558,31 +883,142 @@ def format_time(seconds: TimeSeconds) -> str:
         frac_str = f"{secs_frac.normalize():f}".lstrip("0")
         secs_str = f"{secs_int:02d}{frac_str}"
 
+    return hours, minutes, secs_str
+
+
+def format_time(seconds: TimeSeconds) -> str:
+    """Format seconds into HH:MM:SS, preserving fractional seconds."""
+    hours, minutes, secs_str = _split_time(seconds)
     return f"{hours:02d}:{minutes:02d}:{secs_str}"
 
 
+def _format_clip_stamp(seconds: TimeSeconds) -> str:
+    """Format seconds as an output filename stamp such as 01h02m03s."""
+    hours, minutes, secs_str = _split_time(seconds)
+    return f"{hours:02d}h{minutes:02d}m{secs_str}s"
+
+
+@lru_cache(maxsize=32)
+def _clip_movie_name(stem: str) -> str:
+    """Strip release tags and dots from a movie filename stem."""
+    for pattern in _RELEASE_SUFFIX_PATTERNS:
+        stem = pattern.sub("", stem)
+    return stem.replace(".", "")
+
+
 def generate_output_filename(
     movie_file: Path, start_seconds: TimeSeconds, end_seconds: TimeSeconds
 ) -> str:
     """Generate output filename based on movie and timestamps."""
-    movie_name = movie_file.stem
+    movie_name = _clip_movie_name(movie_file.stem)
+    start_stamp = _format_clip_stamp(start_seconds)
+    end_stamp = _format_clip_stamp(end_seconds)
+    return f"{movie_name}_{start_stamp}_to_{end_stamp}.mp4"
+
+
+def read_segments_file(segments_path: Path) -> List[ClipSegment]:
+    """Read clip segments from a manifest with one "START DURATION [NAME]" per line."""
+    segments = []
+    with segments_path.open(encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            fields = line.split(maxsplit=2)
+            if len(fields) < 2:
+                raise ValueError(f"line {line_number}: expected START DURATION [NAME]")
+            name = fields[2] if len(fields) == 3 else None
+            if name is not None and ("/" in name or "\\" in name):
+                raise ValueError(f"line {line_number}: clip name must not contain a path")
+
+            try:
+                start_seconds = parse_time(fields[0])
+                duration_seconds = parse_time(fields[1])
+            except ValueError as exc:
+                raise ValueError(f"line {line_number}: {exc}") from exc
+            segments.append(ClipSegment(start_seconds, duration_seconds, name))
+
+    if not segments:
+        raise ValueError("no segments found")
+    return segments
 
-    movie_name = re.sub(r"\.(19|20)\d{2}\..*", "", movie_name)
-    movie_name = re.sub(r"\.(BluRay|WEB|HDTV|DVDRip)\..*", "", movie_name, flags=re.IGNORECASE)
-    movie_name = re.sub(r"\.x26[45].*", "", movie_name, flags=re.IGNORECASE)
-    movie_name = movie_name.replace(".", "")
 
-    start_formatted = format_time(start_seconds).replace(":", "h", 1).replace(":", "m", 1) + "s"
-    end_formatted = format_time(end_seconds).replace(":", "h", 1).replace(":", "m", 1) + "s"
+def segment_output_filename(movie_file: Path, segment: ClipSegment) -> str:
+    """Return the output filename for a manifest segment."""
+    if segment.name:
+        return f"{segment.name}.mp4"
+    end_seconds = segment.start_seconds + segment.duration_seconds
+    return generate_output_filename(movie_file, segment.start_seconds, end_seconds)
 
-    return f"{movie_name}_{start_formatted}_to_{end_formatted}.mp4"
 
+def _probe_cache_path(config_value: Optional[Config] = None) -> Path:
+    return get_cache_path(config_value).with_name("ffprobe_cache.json")
 
-def detect_audio_streams(movie_file: Path, ffprobe_path: Optional[Path]) -> List[Dict[str, Any]]:
+
+def _probe_entry_is_current(path: str, entry: Any) -> bool:
+    """Check whether a cached probe still matches the file on disk."""
+    if not isinstance(entry, dict):
+        return False
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime
+
+
+def _load_probe_cache(cache_path: Path) -> Dict[str, Any]:
+    try:
+        cache_data = _json_loads(cache_path.read_bytes())
+    except (ValueError, OSError):
+        return {}
+    return cache_data if isinstance(cache_data, dict) else {}
+
+
+def _save_probe_cache(cache_path: Path, cache_data: Dict[str, Any]) -> None:
+    # Entries for deleted, renamed or rewritten files can never be hit again, so
+    # they are dropped instead of letting the file grow forever.
+    cache_data = {
+        path: entry for path, entry in cache_data.items() if _probe_entry_is_current(path, entry)
+    }
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        temp_path.write_bytes(_json_dumps(cache_data))
+        os.replace(temp_path, cache_path)
+    except OSError as exc:
+        console.print(f"[yellow]Warning: Could not save ffprobe cache: {exc}[/yellow]")
+
+
+def detect_audio_streams(
+    movie_file: Path, ffprobe_path: Optional[Path], config_value: Optional[Config] = None
+) -> List[Dict[str, Any]]:
     """Detect audio streams in a movie file."""
     if ffprobe_path is None:
         return [{"index": 0, "language": "unknown", "channels": 2, "stream_index": 0}]
 
+    if config_value is None:
+        config_value = load_config()
+
+    # ffprobe results are reused while the file keeps the same size and mtime,
+    # so clipping the same movie again does not spawn ffprobe.
+    cache_path = None
+    cache_key = str(movie_file)
+    if config_value.settings.cache_enabled:
+        try:
+            stat = movie_file.stat()
+        except OSError:
+            pass
+        else:
+            cache_path = _probe_cache_path(config_value)
+            probe_cache = _load_probe_cache(cache_path)
+            cached = probe_cache.get(cache_key)
+            if (
+                isinstance(cached, dict)
+                and cached.get("size") == stat.st_size
+                and cached.get("mtime") == stat.st_mtime
+            ):
+                return cached["streams"]
+
     try:
         command = [
             str(ffprobe_path),
@@ -590,7 +1026,10 @@ def detect_audio_streams(movie_file: Path, ffprobe_path: Optional[Path]) -> List
             "quiet",
             "-print_format",
             "json",
-            "-show_streams",
+            # Only the fields read below, so ffprobe skips formatting the full
+            # stream and tag dump.
+            "-show_entries",
+            "stream=index,codec_name,channels,sample_rate:stream_tags=language,title",
             "-select_streams",
             "a",
             str(movie_file),
@@ -612,12 +1051,20 @@ def detect_audio_streams(movie_file: Path, ffprobe_path: Optional[Path]) -> List
                     "stream_index": stream.get("index", i),
                 }
             )
-
-        return audio_streams
     except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as exc:
         console.print(f"[yellow]Warning: Could not detect audio streams: {exc}[/yellow]")
         return [{"index": 0, "language": "unknown", "channels": 2, "stream_index": 0}]
 
+    if cache_path is not None:
+        probe_cache[cache_key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "streams": audio_streams,
+        }
+        _save_probe_cache(cache_path, probe_cache)
+
+    return audio_streams
+
 
 def select_audio_stream(
     audio_streams: List[Dict[str, Any]], preferred_language: str
@@ -637,6 +1084,110 @@ def select_audio_stream(
     return audio_streams[0]
 
 
+def _compute_seek_args(
+    movie_file: Path, start_seconds: TimeSeconds, duration_seconds: TimeSeconds
+) -> List[str]:
+    """Return the input options that cut the requested range from a movie."""
+    # -ss before -i seeks in the demuxer, jumping to the nearest keyframe instead
+    # of decoding everything up to the start time. When re-encoding, ffmpeg then
+    # drops the decoded frames before the start time, so the cut stays exact.
+    # -t also comes before -i: options apply to the next file on the command
+    # line, so with several clips per command a trailing -t would limit the
+    # next input (or the first output) instead of this one.
+    return [
+        "-ss",
+        format_time(start_seconds),
+        "-t",
+        format_time(duration_seconds),
+        "-i",
+        str(movie_file),
+    ]
+
+
+def _audio_stream_matches_output(stream: Dict[str, Any], settings: Settings, stereo: bool) -> bool:
+    """Check whether an audio stream is already in the configured output format."""
+    if stream.get("codec_name") != settings.default_audio_codec:
+        return False
+    if stereo and stream.get("channels") != settings.default_audio_channels:
+        return False
+    try:
+        sample_rate = int(stream.get("sample_rate", 0))
+    except (TypeError, ValueError):
+        return False
+    return sample_rate == settings.default_sample_rate
+
+
+def _select_audio_map(
+    movie_file: Path,
+    ffprobe_path: Optional[Path],
+    preserve_audio: bool,
+    audio_lang: Optional[str],
+    stereo: bool,
+    config_value: Config,
+    audio_copy: bool,
+) -> Tuple[Optional[str], bool]:
+    """Return the audio stream specifier to map and whether audio can be copied."""
+    if preserve_audio:
+        return "a?", audio_copy
+
+    if ffprobe_path is None and audio_lang:
+        console.print(
+            "[yellow]Warning: ffprobe unavailable; audio language selection ignored.[/yellow]"
+        )
+
+    settings = config_value.settings
+    audio_streams = detect_audio_streams(movie_file, ffprobe_path, config_value)
+    if not audio_streams:
+        return None, audio_copy
+
+    target_language = audio_lang or settings.default_audio_language
+    selected_stream = select_audio_stream(audio_streams, target_language)
+    if not selected_stream:
+        return None, audio_copy
+
+    lang_info = (
+        selected_stream["language"]
+        if selected_stream["language"] != "unknown"
+        else "unknown language"
+    )
+    console.print(f"[blue]Selected audio:[/blue] Stream {selected_stream['index']} ({lang_info})")
+    copy_audio = audio_copy or _audio_stream_matches_output(selected_stream, settings, stereo)
+    return f"a:{selected_stream['index']}", copy_audio
+
+
+def _clip_output_args(
+    input_index: int,
+    audio_map: Optional[str],
+    copy_audio: bool,
+    stereo: bool,
+    video_encoder: Optional[str],
+    settings: Settings,
+) -> List[str]:
+    """Return the output options for the clip read from the given input."""
+    args = ["-c:v", video_encoder or "copy", "-map", f"{input_index}:v:0"]
+    if video_encoder == HARDWARE_ENCODERS["vaapi"]:
+        args.extend(["-vf", "format=nv12,hwupload"])
+    if audio_map is not None:
+        args.extend(["-map", f"{input_index}:{audio_map}"])
+
+    # Re-encoding audio is most of the work for short clips, so a stream that
+    # already has the output format is copied as is.
+    if copy_audio:
+        args.extend(["-c:a", "copy"])
+    else:
+        if stereo:
+            args.extend(["-ac", str(settings.default_audio_channels)])
+        args.extend(
+            ["-c:a", settings.default_audio_codec, "-ar", str(settings.default_sample_rate)]
+        )
+
+    if video_encoder is None:
+        # Stream-copied video starts at the keyframe before the seek point; shift
+        # timestamps so the clip starts at zero instead of a negative offset.
+        args.extend(["-avoid_negative_ts", "make_zero"])
+    return args
+
+
 def build_ffmpeg_command(
     movie_file: Path,
     start_seconds: TimeSeconds,
@@ -648,77 +1199,83 @@ def build_ffmpeg_command(
     audio_lang: Optional[str] = None,
     stereo: bool = True,
     config_value: Optional[Config] = None,
+    audio_copy: bool = False,
+    reencode: bool = False,
+    video_encoder: str = REENCODE_VIDEO_CODEC,
+    threads: Optional[int] = None,
 ) -> List[str]:
     """Build ffmpeg command for clipping."""
+    [command] = build_ffmpeg_batch_commands(
+        movie_file,
+        [[(start_seconds, duration_seconds, output_file)]],
+        ffmpeg_path,
+        ffprobe_path,
+        preserve_audio,
+        audio_lang,
+        stereo,
+        config_value,
+        audio_copy,
+        reencode,
+        video_encoder,
+        threads,
+    )
+    return command
+
+
+def build_ffmpeg_batch_commands(
+    movie_file: Path,
+    batches: List[List[Tuple[TimeSeconds, TimeSeconds, Path]]],
+    ffmpeg_path: Path,
+    ffprobe_path: Optional[Path],
+    preserve_audio: bool = False,
+    audio_lang: Optional[str] = None,
+    stereo: bool = True,
+    config_value: Optional[Config] = None,
+    audio_copy: bool = False,
+    reencode: bool = False,
+    video_encoder: str = REENCODE_VIDEO_CODEC,
+    threads: Optional[int] = None,
+) -> List[List[str]]:
+    """Build one ffmpeg command per batch of (start, duration, output) clips.
+
+    ``threads`` caps the encoder and filter threads of each ffmpeg; 0 lets ffmpeg
+    pick and None leaves its defaults untouched.
+    """
     if config_value is None:
         config_value = load_config()
 
-    start_time = format_time(start_seconds)
-    duration_time = format_time(duration_seconds)
-
-    command = [
-        str(ffmpeg_path),
-        "-y",
-        "-ss",
-        start_time,
-        "-i",
-        str(movie_file),
-        "-t",
-        duration_time,
-        "-c:v",
-        "copy",
-    ]
+    audio_map, copy_audio = _select_audio_map(
+        movie_file, ffprobe_path, preserve_audio, audio_lang, stereo, config_value, audio_copy
+    )
 
-    if preserve_audio:
-        command.extend(["-map", "0:v:0", "-map", "0:a?"])
-        if stereo:
-            command.extend(["-ac", str(config_value.settings.default_audio_channels)])
-        command.extend(
-            [
-                "-c:a",
-                config_value.settings.default_audio_codec,
-                "-ar",
-                str(config_value.settings.default_sample_rate),
-            ]
-        )
-    else:
-        if ffprobe_path is None and audio_lang:
-            console.print(
-                "[yellow]Warning: ffprobe unavailable; audio language selection ignored.[/yellow]"
+    # Each clip opens the movie as its own input so every cut keeps a fast
+    # demuxer-side seek, while ffmpeg starts (and the movie is probed) once per
+    # batch rather than once per clip.
+    encoder = video_encoder if reencode else None
+    commands = []
+    for clips in batches:
+        command = [str(ffmpeg_path), "-y"]
+        if threads is not None:
+            filter_threads = str(threads or os.cpu_count() or 1)
+            command.extend(
+                ["-filter_threads", filter_threads, "-filter_complex_threads", filter_threads]
             )
-
-        audio_streams = detect_audio_streams(movie_file, ffprobe_path)
-
-        if audio_streams:
-            target_language = audio_lang or config_value.settings.default_audio_language
-            selected_stream = select_audio_stream(audio_streams, target_language)
-
-            if selected_stream:
-                command.extend(["-map", "0:v:0"])
-                command.extend(["-map", f"0:a:{selected_stream['index']}"])
-                lang_info = (
-                    selected_stream["language"]
-                    if selected_stream["language"] != "unknown"
-                    else "unknown language"
-                )
-                console.print(
-                    f"[blue]Selected audio:[/blue] Stream {selected_stream['index']} ({lang_info})"
+        if encoder == HARDWARE_ENCODERS["vaapi"]:
+            command.extend(["-vaapi_device", VAAPI_DEVICE])
+        for start_seconds, duration_seconds, _ in clips:
+            command.extend(_compute_seek_args(movie_file, start_seconds, duration_seconds))
+        for input_index, (_, _, output_file) in enumerate(clips):
+            command.extend(
+                _clip_output_args(
+                    input_index, audio_map, copy_audio, stereo, encoder, config_value.settings
                 )
-
-        if stereo:
-            command.extend(["-ac", str(config_value.settings.default_audio_channels)])
-
-        command.extend(
-            [
-                "-c:a",
-                config_value.settings.default_audio_codec,
-                "-ar",
-                str(config_value.settings.default_sample_rate),
-            ]
-        )
-
-    command.append(str(output_file))
-    return command
+            )
+            if threads is not None:
+                command.extend(["-threads", str(threads)])
+            # The explicit protocol keeps ffmpeg from reading "name:" prefixes as URLs.
+            command.append(f"file:{output_file}")
+        commands.append(command)
+    return commands
 
 
 def _resolve_executable(
@@ -786,6 +1343,64 @@ def _verify_tool(path: Path, label: str) -> None:
         sys.exit(1)
 
 
+@cache
+def _listed_encoders(ffmpeg_path: Path) -> frozenset[str]:
+    """Return the encoder names compiled into an ffmpeg binary."""
+    try:
+        result = subprocess.run(
+            [str(ffmpeg_path), "-hide_banner", "-encoders"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+    # Encoder lines look like " V....D h264_nvenc  NVIDIA NVENC H.264 encoder".
+    return frozenset(
+        fields[1]
+        for fields in (line.split() for line in result.stdout.splitlines())
+        if len(fields) >= 2 and len(fields[0]) == 6
+    )
+
+
+@cache
+def _encoder_works(ffmpeg_path: Path, encoder: str) -> bool:
+    """Check that an encoder can actually encode on this machine."""
+    # Hardware encoders are often listed without a usable device or driver, so
+    # a few generated frames are encoded and discarded to find out.
+    command = [str(ffmpeg_path), "-hide_banner", "-v", "error"]
+    if encoder == HARDWARE_ENCODERS["vaapi"]:
+        command.extend(["-vaapi_device", VAAPI_DEVICE])
+    command.extend(["-f", "lavfi", "-i", "color=size=256x256:duration=0.1"])
+    if encoder == HARDWARE_ENCODERS["vaapi"]:
+        command.extend(["-vf", "format=nv12,hwupload"])
+    command.extend(["-c:v", encoder, "-f", "null", "-"])
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=30)
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return False
+    return True
+
+
+def resolve_video_encoder(ffmpeg_path: Path, choice: str) -> str:
+    """Return the ffmpeg video encoder for an --encoder choice."""
+    if choice == "cpu":
+        return REENCODE_VIDEO_CODEC
+
+    listed = _listed_encoders(ffmpeg_path)
+    if choice == "auto":
+        for encoder in HARDWARE_ENCODERS.values():
+            if encoder in listed and _encoder_works(ffmpeg_path, encoder):
+                return encoder
+        return REENCODE_VIDEO_CODEC
+
+    encoder = HARDWARE_ENCODERS[choice]
+    if encoder not in listed or not _encoder_works(ffmpeg_path, encoder):
+        console.print(f"[red]Error: {encoder} is not available with {ffmpeg_path}.[/red]")
+        sys.exit(1)
+    return encoder
+
+
 def check_ffmpeg(
     ffmpeg_path: Optional[str], ffprobe_path: Optional[str], require_ffprobe: bool = False
 ) -> FfmpegTools:
@@ -817,39 +1432,203 @@ def check_environment(ffmpeg_path: Optional[str], ffprobe_path: Optional[str]) -
 
     try:
         read_config(config_path)
-    except (ValidationError, FileNotFoundError, toml.TomlDecodeError) as exc:
+    except (ValidationError, FileNotFoundError, tomllib.TOMLDecodeError) as exc:
         console.print(f"[red]Config file is invalid: {exc}[/red]")
         sys.exit(1)
 
-    console.print("[green]ffmpeg:[/green] " + str(tools.ffmpeg))
     if tools.ffprobe:
-        console.print("[green]ffprobe:[/green] " + str(tools.ffprobe))
+        ffprobe_line = "[green]ffprobe:[/green] " + str(tools.ffprobe)
     else:
-        console.print("[yellow]ffprobe:[/yellow] not found")
-    console.print("[green]Config file:[/green] " + str(config_path))
+        ffprobe_line = "[yellow]ffprobe:[/yellow] not found"
+    console.print(
+        "\n".join(
+            [
+                "[green]ffmpeg:[/green] " + str(tools.ffmpeg),
+                ffprobe_line,
+                "[green]Config file:[/green] " + str(config_path),
+            ]
+        )
+    )
+
 
+def _ensure_dir(path: Path) -> None:
+    """Create a directory once per process."""
+    if path not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(path)
 
-def execute_ffmpeg(command: List[str]) -> bool:
+
+def _drop_page_cache(path: Path) -> None:
+    """Ask the kernel to evict a written clip from the page cache."""
+    # Clips are rarely read back right away; dropping them keeps the source
+    # movie's pages cached for the next clip. Not available on macOS/Windows.
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _prefetch_movie_ranges(
+    movie_file: Path,
+    ffprobe_path: Optional[Path],
+    ranges: List[Tuple[TimeSeconds, TimeSeconds]],
+) -> None:
+    """Ask the kernel to start reading the parts of the movie that will be clipped."""
+    # Byte offsets are estimated from the average bitrate, which needs the movie
+    # duration from ffprobe. Not available on macOS/Windows.
+    if ffprobe_path is None or not hasattr(os, "posix_fadvise"):
+        return
+    command = [
+        str(ffprobe_path),
+        "-v",
+        "quiet",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(movie_file),
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        movie_duration = float(result.stdout)
+        movie_size = movie_file.stat().st_size
+        fd = os.open(movie_file, os.O_RDONLY)
+    except (subprocess.CalledProcessError, ValueError, OSError):
+        return
+    try:
+        if movie_duration <= 0:
+            return
+        bytes_per_second = movie_size / movie_duration
+        for start_seconds, duration_seconds in ranges:
+            first = max(0.0, float(start_seconds) - PREFETCH_LEAD_SECONDS)
+            # The bitrate varies across the movie, so read a bit past the estimate.
+            length = (
+                float(start_seconds) - first + float(duration_seconds) * 1.2
+            ) * bytes_per_second
+            os.posix_fadvise(fd, int(first * bytes_per_second), int(length), os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _run_ffmpeg(
+    command: List[str], on_position: Optional[Callable[[float], None]] = None
+) -> Tuple[int, List[str]]:
+    """Run ffmpeg, reporting its position in seconds; return the exit code and log tail."""
+    # ffmpeg's log is streamed rather than buffered; only the tail is kept for
+    # error reports, since long encodes print a status line several times a second.
+    log_tail: deque[str] = deque(maxlen=FFMPEG_LOG_LINES)
+
+    # ffmpeg reads keys from stdin and changes the terminal settings while doing
+    # so; parallel jobs would race on them and could leave the shell without echo.
+    with subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    ) as process:
+        # Universal newlines also split the carriage-return status updates.
+        for line in process.stderr:
+            line = line.rstrip()
+            if not line:
+                continue
+            log_tail.append(line)
+            match = _FFMPEG_TIME_PATTERN.search(line)
+            if match and on_position is not None:
+                hours, minutes, seconds = match.groups()
+                on_position(int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+
+    return process.returncode, list(log_tail)
+
+
+def _progress_columns() -> Tuple[Any, ...]:
+    from rich.progress import BarColumn, SpinnerColumn, TextColumn
+
+    return (SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn())
+
+
+def execute_ffmpeg(command: List[str], duration_seconds: Optional[TimeSeconds] = None) -> bool:
     """Execute ffmpeg command with progress feedback."""
+    from rich.progress import Progress
+
     console.print(f"[green]Executing:[/green] {' '.join(command)}")
 
-    try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True,
-        ) as progress:
-            task = progress.add_task("Processing video...", total=None)
-
-            subprocess.run(command, capture_output=True, text=True, check=True)
+    total = float(duration_seconds) if duration_seconds else None
+    with Progress(*_progress_columns(), console=console, transient=True) as progress:
+        task = progress.add_task("Processing video...", total=total)
+
+        def on_position(position: float) -> None:
+            if total:
+                progress.update(task, completed=min(position, total))
+
+        returncode, log_tail = _run_ffmpeg(command, on_position)
+        if returncode == 0:
             progress.update(task, description="Video processed successfully")
 
-        return True
-    except subprocess.CalledProcessError as exc:
-        console.print(f"[red]FFmpeg error:[/red] {exc.stderr}")
+    if returncode != 0:
+        log_text = "\n".join(log_tail)
+        console.print(f"[red]FFmpeg error:[/red] {log_text}")
         return False
 
+    return True
+
+
+def execute_ffmpeg_jobs(jobs: List[Tuple[List[str], TimeSeconds]], max_workers: int) -> bool:
+    """Execute several ffmpeg commands concurrently, with one progress bar each."""
+    from rich.progress import Progress
+
+    console.print(
+        "\n".join(f"[green]Executing:[/green] {' '.join(command)}" for command, _ in jobs)
+    )
+
+    # Each job is its own ffmpeg process; threads only wait on them and relay
+    # their progress.
+    with Progress(*_progress_columns(), console=console, transient=True) as progress:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for number, (command, duration_seconds) in enumerate(jobs, 1):
+                total = float(duration_seconds) if duration_seconds else None
+                task = progress.add_task(f"Job {number}/{len(jobs)}", total=total)
+
+                def on_position(position: float, task=task, total=total) -> None:
+                    if total:
+                        progress.update(task, completed=min(position, total))
+
+                futures.append(executor.submit(_run_ffmpeg, command, on_position))
+            results = [future.result() for future in futures]
+
+    success = True
+    for number, (returncode, log_tail) in enumerate(results, 1):
+        if returncode != 0:
+            log_text = "\n".join(log_tail)
+            console.print(f"[red]FFmpeg error (job {number}):[/red] {log_text}")
+            success = False
+    return success
+
+
+def _confirm_clipping(assume_yes: bool, while_waiting: Optional[Callable[[], None]] = None) -> bool:
+    """Ask before running ffmpeg, unless --yes is set or nobody can answer.
+
+    ``while_waiting`` runs in a background thread while the prompt is shown.
+    """
+    # Scripts and pipes cannot answer the prompt, so it is only shown on a terminal.
+    if assume_yes or not sys.stdin.isatty():
+        return True
+    if while_waiting is not None:
+        threading.Thread(target=while_waiting, daemon=True).start()
+    return Confirm.ask("Proceed with clipping?", default=True)
+
 
 @click.command()
 @click.argument("movie_input", required=False)
@@ -867,6 +1646,49 @@ def execute_ffmpeg(command: List[str]) -> bool:
 )
 @click.option("--audio-lang", help="Select specific audio language (e.g., eng, fre, spa)")
 @click.option("--stereo/--no-stereo", default=True, help="Force stereo mix (default: stereo)")
+@click.option(
+    "--audio-copy",
+    is_flag=True,
+    help="Copy audio without re-encoding (skips codec, sample rate and channel conversion)",
+)
+@click.option(
+    "--reencode",
+    is_flag=True,
+    help="Re-encode video for frame-accurate cuts (slower than the default stream copy)",
+)
+@click.option(
+    "--encoder",
+    type=click.Choice(["auto", "cpu", *HARDWARE_ENCODERS]),
+    default="auto",
+    show_default=True,
+    help="Video encoder for --reencode (auto picks the first working GPU encoder)",
+)
+@click.option(
+    "--segments",
+    "segments_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Cut every clip listed in a file (one 'START DURATION [NAME]' per line)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of ffmpeg processes to run in parallel with --segments",
+)
+@click.option(
+    "--threads",
+    type=click.IntRange(min=0),
+    help="Threads per ffmpeg process (0 lets ffmpeg decide; shared across --jobs by default)",
+)
+@click.option(
+    "--yes",
+    "-y",
+    "assume_yes",
+    is_flag=True,
+    help="Start clipping without asking for confirmation",
+)
 @click.option("--clear-cache", is_flag=True, help="Clear movie index cache")
 @click.option("--cache-info", is_flag=True, help="Show cache information")
 def main(
@@ -881,6 +1703,13 @@ def main(
     preserve_audio: bool,
     audio_lang: Optional[str],
     stereo: bool,
+    audio_copy: bool,
+    reencode: bool,
+    encoder: str,
+    segments_file: Optional[Path],
+    jobs: int,
+    threads: Optional[int],
+    assume_yes: bool,
     clear_cache: bool,
     cache_info: bool,
 ) -> None:
@@ -891,6 +1720,7 @@ def main(
 
     if setup:
         setup_config()
+        load_config.cache_clear()
         return
 
     if clear_cache:
@@ -899,13 +1729,20 @@ def main(
 
     if cache_info:
         info = get_cache_info()
-        if info["exists"]:
-            console.print("[green]Cache Information:[/green]")
-            console.print(f"  Path: {info['path']}")
-            console.print(f"  Movies: {info['movies_count']}")
-            console.print(f"  Age: {info['age_hours']:.1f} hours")
-            console.print(f"  Size: {info['size_bytes'] / 1024:.1f} KB")
-            console.print(f"  Movies Directory: {info['movies_dir']}")
+        if info.get("outdated"):
+            console.print(
+                f"[yellow]Cache at {info['path']} is outdated and will be rebuilt "
+                "on the next search[/yellow]"
+            )
+        elif info["exists"]:
+            console.print(
+                "[green]Cache Information:[/green]\n"
+                f"  Path: {info['path']}\n"
+                f"  Movies: {info['movies_count']}\n"
+                f"  Age: {info['age_hours']:.1f} hours\n"
+                f"  Size: {info['size_bytes'] / 1024:.1f} KB\n"
+                f"  Movies Directory: {info['movies_dir']}"
+            )
         else:
             console.print("[yellow]No cache found[/yellow]")
         return
@@ -915,6 +1752,17 @@ def main(
         console.print("Usage: movieclipper MOVIE_INPUT [OPTIONS]")
         sys.exit(1)
 
+    segments = None
+    if segments_file is not None:
+        if start or duration:
+            console.print("[red]Error: --segments cannot be combined with --start/--duration[/red]")
+            sys.exit(1)
+        try:
+            segments = read_segments_file(segments_file)
+        except (ValueError, OSError) as exc:
+            console.print(f"[red]Segments file error: {exc}[/red]")
+            sys.exit(1)
+
     tools = check_ffmpeg(ffmpeg_path, ffprobe_path, require_ffprobe=False)
     config_value = load_config()
 
@@ -925,6 +1773,95 @@ def main(
     movie_file = select_movie_file(movie_input, config_value)
     console.print(f"[green]Selected movie:[/green] {movie_file.name}")
 
+    video_encoder = REENCODE_VIDEO_CODEC
+    if reencode:
+        video_encoder = resolve_video_encoder(tools.ffmpeg, encoder)
+        console.print(f"[blue]Video encoder:[/blue] {video_encoder}")
+
+    if test:
+        output_dir = config_value.directories.clips_dir.parent / "clips_testing"
+        _ensure_dir(output_dir)
+    else:
+        output_dir = config_value.directories.clips_dir
+
+    if segments is not None:
+        segments.sort(key=lambda segment: segment.start_seconds)
+        clips = [
+            (
+                segment.start_seconds,
+                segment.duration_seconds,
+                output_dir / segment_output_filename(movie_file, segment),
+            )
+            for segment in segments
+        ]
+        if len({output_file for _, _, output_file in clips}) != len(clips):
+            console.print("[red]Error: --segments lists the same output file twice[/red]")
+            sys.exit(1)
+
+        # Clips are dealt round-robin so each ffmpeg gets a similar share.
+        batches = [batch for offset in range(jobs) if (batch := clips[offset::jobs])]
+        # With fewer segments than --jobs only len(batches) processes run, so the
+        # cores are shared between those rather than the requested job count.
+        job_count = len(batches)
+        if threads is None and job_count > 1:
+            # Each ffmpeg would otherwise start one thread per core.
+            threads = max(1, (os.cpu_count() or 1) // job_count)
+        # Long batches run as several ffmpeg commands one after another, so memory
+        # and open files stay bounded and a bad segment only fails its own command.
+        batches = [
+            batch[offset : offset + MAX_CLIPS_PER_COMMAND]
+            for batch in batches
+            for offset in range(0, len(batch), MAX_CLIPS_PER_COMMAND)
+        ]
+        commands = build_ffmpeg_batch_commands(
+            movie_file,
+            batches,
+            tools.ffmpeg,
+            tools.ffprobe,
+            preserve_audio,
+            audio_lang,
+            stereo,
+            config_value,
+            audio_copy,
+            reencode,
+            video_encoder,
+            threads,
+        )
+
+        clip_lines = [
+            f"  {format_time(start_seconds)} to {format_time(start_seconds + duration_seconds)}"
+            f"  {output_file.name}"
+            for start_seconds, duration_seconds, output_file in clips
+        ]
+        console.print("\n".join([f"[blue]Creating {len(clips)} clips:[/blue]", *clip_lines]))
+
+        ranges = [(start_seconds, duration_seconds) for start_seconds, duration_seconds, _ in clips]
+        if not _confirm_clipping(
+            assume_yes, lambda: _prefetch_movie_ranges(movie_file, tools.ffprobe, ranges)
+        ):
+            console.print("[yellow]Cancelled.[/yellow]")
+            return
+
+        if len(commands) == 1:
+            longest = max(segment.duration_seconds for segment in segments)
+            success = execute_ffmpeg(commands[0], longest)
+        else:
+            success = execute_ffmpeg_jobs(
+                [
+                    (command, max(duration for _, duration, _ in batch))
+                    for command, batch in zip(commands, batches)
+                ],
+                job_count,
+            )
+        if success:
+            for _, _, output_file in clips:
+                _drop_page_cache(output_file)
+            console.print(f"[green]{len(clips)} clips created in:[/green] {output_dir}")
+        else:
+            console.print("[red]Failed to create clips.[/red]")
+            sys.exit(1)
+        return
+
     if not start:
         start = Prompt.ask("Start time (HH:MM:SS, MM:SS, or seconds)", default="0")
 
@@ -940,13 +1877,7 @@ def main(
 
     end_seconds = start_seconds + duration_seconds
     output_filename = generate_output_filename(movie_file, start_seconds, end_seconds)
-
-    if test:
-        output_dir = config_value.directories.clips_dir.parent / "clips_testing"
-        output_dir.mkdir(exist_ok=True)
-        output_file = output_dir / output_filename
-    else:
-        output_file = config_value.directories.clips_dir / output_filename
+    output_file = output_dir / output_filename
 
     command = build_ffmpeg_command(
         movie_file,
@@ -959,19 +1890,31 @@ def main(
         audio_lang,
         stereo,
         config_value,
+        audio_copy,
+        reencode,
+        video_encoder,
+        threads,
     )
 
-    console.print(f"[blue]Creating clip:[/blue] {output_filename}")
-    console.print(f"[blue]From:[/blue] {format_time(start_seconds)} to {format_time(end_seconds)}")
-    console.print(f"[blue]Duration:[/blue] {format_time(duration_seconds)}")
+    console.print(
+        f"[blue]Creating clip:[/blue] {output_filename}\n"
+        f"[blue]From:[/blue] {format_time(start_seconds)} to {format_time(end_seconds)}\n"
+        f"[blue]Duration:[/blue] {format_time(duration_seconds)}"
+    )
 
-    if not Confirm.ask("Proceed with clipping?", default=True):
+    if not _confirm_clipping(
+        assume_yes,
+        lambda: _prefetch_movie_ranges(
+            movie_file, tools.ffprobe, [(start_seconds, duration_seconds)]
+        ),
+    ):
         console.print("[yellow]Cancelled.[/yellow]")
         return
 
-    success = execute_ffmpeg(command)
+    success = execute_ffmpeg(command, duration_seconds)
 
     if success:
+        _drop_page_cache(output_file)
         console.print("[green]Clip created successfully.[/green]")
         console.print(f"[green]Output:[/green] {output_file}")
     else:
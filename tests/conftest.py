@@ -0,0 +1,19 @@
+import pytest
+from click.testing import CliRunner
+
+from movieclipper import cli
+
+
+@pytest.fixture(scope="session")
+def cli_runner():
+    return CliRunner()
+
+
+@pytest.fixture
+def reset_config():
+    """Forget the memoized config for tests that load it from disk."""
+    cli.load_config.cache_clear()
+    cli._cache_path_for.cache_clear()
+    yield
+    cli.load_config.cache_clear()
+    cli._cache_path_for.cache_clear()
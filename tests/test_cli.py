@@ -1,22 +1,17 @@
 import errno
+import os
+import subprocess
+import sys
 import time
 from decimal import Decimal
 from pathlib import Path
 
 import pytest
-import toml
-from click.testing import CliRunner
+import tomli_w
 
 from movieclipper import cli
 
 
-@pytest.fixture(autouse=True)
-def reset_config():
-    cli.config = None
-    yield
-    cli.config = None
-
-
 def make_config(tmp_path: Path) -> cli.Config:
     movies_dir = tmp_path / "movies"
     clips_dir = tmp_path / "clips"
@@ -29,23 +24,37 @@ def make_cache_data(movies_dir: Path, config: cli.Config, timestamp=None) -> dic
     if timestamp is None:
         timestamp = time.time()
     return {
+        "version": cli.CACHE_VERSION,
         "timestamp": timestamp,
         "movies_dir": str(movies_dir),
         "follow_symlinks": config.settings.follow_symlinks,
         "extensions": list(config.settings.video_extensions),
-        "movies": [
-            {"path": str(movies_dir / "movie.mkv"), "size": 123, "mtime": 456.0},
-        ],
+        "movies": {
+            "paths": [str(movies_dir / "movie.mkv")],
+            "sizes": [123],
+            "mtimes": [456.0],
+            "stems": ["movie"],
+            "parents": ["movies"],
+        },
+        "directories": {"paths": [str(movies_dir)], "mtimes": [789]},
     }
 
 
+def patch_main(monkeypatch, config: cli.Config, movie_file: Path) -> None:
+    """Stub the config, ffmpeg lookup and movie selection that main() relies on."""
+    tools = cli.FfmpegTools(ffmpeg=Path("/usr/bin/ffmpeg"), ffprobe=None)
+    monkeypatch.setattr(cli, "load_config", lambda: config)
+    monkeypatch.setattr(cli, "check_ffmpeg", lambda *_args, **_kwargs: tools)
+    monkeypatch.setattr(cli, "select_movie_file", lambda *_args: movie_file)
+
+
 def test_read_config_creates_missing_clips_dir(tmp_path):
     movies_dir = tmp_path / "movies"
     movies_dir.mkdir()
     clips_dir = tmp_path / "clips"
     config_path = tmp_path / "movieclipper.toml"
     config_path.write_text(
-        toml.dumps(
+        tomli_w.dumps(
             {
                 "directories": {
                     "movies_dir": str(movies_dir),
@@ -62,29 +71,55 @@ def test_read_config_creates_missing_clips_dir(tmp_path):
     assert config.directories.clips_dir == clips_dir
 
 
-def test_validate_movies_dir_rejects_unreadable(tmp_path):
+def test_save_config_round_trips_unset_cache_location(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    config_path = tmp_path / "config" / "movieclipper.toml"
+    monkeypatch.setattr(cli, "get_config_path", lambda: config_path)
+
+    cli.save_config(config)
+
+    assert "cache_location" not in config_path.read_text(encoding="utf-8")
+    assert cli.read_config(config_path) == config
+
+
+def test_load_config_reads_file_once(monkeypatch, tmp_path, reset_config):
+    config = make_config(tmp_path)
+    config_path = tmp_path / "config" / "movieclipper.toml"
+    monkeypatch.setattr(cli, "get_config_path", lambda: config_path)
+    cli.save_config(config)
+    calls = []
+
+    def counting_read_config(path):
+        calls.append(path)
+        return config
+
+    monkeypatch.setattr(cli, "read_config", counting_read_config)
+
+    assert cli.load_config() is cli.load_config()
+    assert calls == [config_path]
+
+
+def test_validate_movies_dir_rejects_unreadable(monkeypatch, tmp_path):
     movies_dir = tmp_path / "movies"
     clips_dir = tmp_path / "clips"
     movies_dir.mkdir()
     clips_dir.mkdir()
-    movies_dir.chmod(0o000)
-    try:
-        with pytest.raises(ValueError, match="not readable"):
-            cli.DirectoryConfig(movies_dir=movies_dir, clips_dir=clips_dir)
-    finally:
-        movies_dir.chmod(0o755)
-
+    # Faked rather than chmod'ed: root and Windows can read the directory anyway.
+    monkeypatch.setattr(
+        cli.os, "access", lambda path, mode: mode != os.R_OK or Path(path) != movies_dir
+    )
 
-def test_parse_time_formats():
-    assert cli.parse_time("90") == Decimal("90")
-    assert cli.parse_time("1:30") == Decimal("90")
-    assert cli.parse_time("1:30.5") == Decimal("90.5")
-    assert cli.parse_time("01:02:03") == Decimal("3723")
+    with pytest.raises(ValueError, match="not readable"):
+        cli.DirectoryConfig(movies_dir=movies_dir, clips_dir=clips_dir)
 
 
 @pytest.mark.parametrize(
     ("value", "expected"),
     [
+        ("90", Decimal("90")),
+        ("1:30", Decimal("90")),
+        ("1:30.5", Decimal("90.5")),
+        ("01:02:03", Decimal("3723")),
         ("0", Decimal("0")),
         ("00", Decimal("0")),
         ("1:02", Decimal("62")),
@@ -94,21 +129,19 @@ def test_parse_time_formats():
         ("00:00:05", Decimal("5")),
         ("1.123456", Decimal("1.123456")),
         ("0:01.999999", Decimal("1.999999")),
+        (".5", Decimal("0.5")),
+        ("5.", Decimal("5")),
     ],
 )
 def test_parse_time_edge_cases(value, expected):
     assert cli.parse_time(value) == expected
 
 
-def test_parse_time_invalid():
-    with pytest.raises(ValueError):
-        cli.parse_time("1:2:3:4")
-
-
 @pytest.mark.parametrize(
     "value",
     [
         "",
+        "1:2:3:4",
         "1:",
         ":30",
         "abc",
@@ -116,6 +149,11 @@ def test_parse_time_invalid():
         "1:2:xx",
         "-5",
         "-1:30",
+        ".",
+        "1.2.3",
+        "1.5:30",
+        "1:2e3",
+        "+5",
     ],
 )
 def test_parse_time_invalid_edge_cases(value):
@@ -133,12 +171,24 @@ def test_format_time_handles_decimal_sum():
     assert cli.format_time(start + duration) == "00:00:00.3"
 
 
+@pytest.mark.parametrize("value", [90, 90.0, Decimal("90"), Decimal("90.000")])
+def test_format_time_equal_values_share_format(value):
+    assert cli.format_time(value) == "00:01:30"
+    assert cli._format_clip_stamp(value) == "00h01m30s"
+
+
 def test_generate_output_filename():
     movie_file = Path("Iron.Man.2008.BluRay.x264.mkv")
     filename = cli.generate_output_filename(movie_file, 60, 120)
     assert filename == "IronMan_00h01m00s_to_00h02m00s.mp4"
 
 
+def test_generate_output_filename_keeps_fractional_seconds():
+    movie_file = Path("Alien.BluRay.1979.x264.mkv")
+    filename = cli.generate_output_filename(movie_file, Decimal("1.5"), 3723)
+    assert filename == "AlienBluRay_00h00m01.5s_to_01h02m03s.mp4"
+
+
 def test_fuzzy_match_movie_no_matches():
     movie_files = [Path("/movies/Alpha.mkv"), Path("/movies/Beta.mkv")]
     assert cli.fuzzy_match_movie("zzzz", movie_files) == []
@@ -154,6 +204,77 @@ def test_fuzzy_match_movie_uses_parent_folder():
     assert matches[0][0].name == "Iron.Man.mkv"
 
 
+def test_fuzzy_match_movie_shares_folder_score():
+    movie_files = [
+        Path("/movies/Ghibli/Spirited.Away.mkv"),
+        Path("/movies/Ghibli/Totoro.mkv"),
+        Path("/movies/Other/Random.mkv"),
+    ]
+    matches = cli.fuzzy_match_movie("ghibli", movie_files)
+    assert [(path.name, score) for path, score in matches] == [
+        ("Spirited.Away.mkv", 100),
+        ("Totoro.mkv", 100),
+    ]
+
+
+def test_fuzzy_match_movie_orders_ties_by_path():
+    movie_files = [Path("/movies/b/Heat.mkv"), Path("/movies/a/Heat.mkv")]
+
+    matches = cli.fuzzy_match_movie("Heat", movie_files)
+
+    assert [movie_file for movie_file, _ in matches] == sorted(movie_files)
+
+
+def test_fuzzy_match_movie_accepts_movie_index():
+    movie_files = [
+        Path("/movies/Marvel/Iron.Man.mkv"),
+        Path("/movies/Other/Random.mkv"),
+    ]
+    index = cli.MovieIndex.from_paths(movie_files)
+
+    assert index.stems == ["iron man", "random"]
+    assert index.parents == ["marvel", "other"]
+    assert cli.fuzzy_match_movie("Marvel", index) == cli.fuzzy_match_movie("Marvel", movie_files)
+
+
+ORACLE_MOVIES = [
+    Path("/movies/Marvel/Iron.Man.2008.1080p.BluRay.x264.mkv"),
+    Path("/movies/Marvel/Captain.America.2011.mkv"),
+    Path("/movies/Heat/Heat.1995.mkv"),
+    Path("/movies/Alien.mkv"),
+    Path("/movies/Spirited Away/Spirited.Away.mkv"),
+]
+
+
+@pytest.mark.parametrize("query", ["iron man", "Captain", "marvel", "heat", "alien", "away"])
+def test_fuzzy_match_movie_agrees_with_per_file_scores(query):
+    from rapidfuzz import fuzz
+
+    # Reference: score each file on its own, keeping the better of name and folder.
+    expected = []
+    for movie_file in ORACLE_MOVIES:
+        stem, parent = cli.movie_search_keys(movie_file)
+        score = fuzz.partial_ratio(cli._search_key(query), stem)
+        if parent is not None:
+            score = max(score, fuzz.partial_ratio(cli._search_key(query), parent))
+        if score > cli.MATCH_THRESHOLD:
+            expected.append((movie_file, score))
+    expected.sort(key=lambda item: (-item[1], str(item[0])))
+
+    assert cli.fuzzy_match_movie(query, ORACLE_MOVIES) == expected
+
+
+def test_movie_search_keys_skip_repeated_folder_name():
+    assert cli.movie_search_keys(Path("/movies/Alien/Alien/Alien.mkv")) == ("alien", None)
+
+
+def test_movie_search_keys_treat_separators_as_spaces():
+    movie_file = Path("/movies/Spirited_Away/Spirited.Away.2001.mkv")
+
+    assert cli.movie_search_keys(movie_file) == ("spirited away 2001", "spirited away")
+    assert cli.fuzzy_match_movie("Spirited  Away", [movie_file]) == [(movie_file, 100)]
+
+
 def test_is_cache_valid_accepts_fresh_cache(tmp_path):
     config = make_config(tmp_path)
     movies_dir = config.directories.movies_dir
@@ -165,6 +286,7 @@ def test_is_cache_valid_accepts_fresh_cache(tmp_path):
     "mutator",
     [
         lambda data, config: data.pop("movies"),
+        lambda data, config: data.__setitem__("version", cli.CACHE_VERSION - 1),
         lambda data, config: data.__setitem__(
             "movies_dir", str(Path(data["movies_dir"]) / "other")
         ),
@@ -186,58 +308,200 @@ def test_is_cache_valid_rejects_mismatches(tmp_path, mutator):
     assert cli.is_cache_valid(cache_data, movies_dir, config) is False
 
 
+def test_find_movie_index_keeps_expired_cache_for_unchanged_library(monkeypatch, tmp_path):
+    movies_dir = tmp_path / "movies"
+    (movies_dir / "Heat").mkdir(parents=True)
+    (movies_dir / "Heat" / "Heat.mkv").touch()
+    config = cli.Config(
+        directories=cli.DirectoryConfig(movies_dir=movies_dir, clips_dir=tmp_path / "clips"),
+        settings=cli.Settings(cache_location=str(tmp_path / "cache")),
+    )
+    builds = []
+    build_movie_cache = cli.build_movie_cache
+    monkeypatch.setattr(
+        cli, "build_movie_cache", lambda *args: builds.append(args) or build_movie_cache(*args)
+    )
+
+    def find_after_ttl():
+        cache_data = cli.load_movie_cache(config)
+        cache_data["timestamp"] -= (config.settings.cache_ttl_hours + 1) * 3600
+        cli.save_movie_cache(cache_data, config)
+        return cli.find_movie_index(
+            movies_dir, config.settings.video_extensions, config_value=config
+        )
+
+    cli.find_movie_index(movies_dir, config.settings.video_extensions, config_value=config)
+    assert find_after_ttl().paths == [movies_dir / "Heat" / "Heat.mkv"]
+    assert len(builds) == 1
+    assert cli.is_cache_valid(cli.load_movie_cache(config), movies_dir, config) is True
+
+    (movies_dir / "Heat" / "Heat.Extras.mkv").touch()
+    # Filesystems with coarse timestamps could keep the same mtime otherwise.
+    os.utime(movies_dir / "Heat", ns=(0, 0))
+
+    assert len(find_after_ttl().paths) == 2
+    assert len(builds) == 2
+
+
+def test_find_movie_index_rescans_directory_that_was_unreadable(monkeypatch, tmp_path):
+    movies_dir = tmp_path / "movies"
+    (movies_dir / "Heat").mkdir(parents=True)
+    (movies_dir / "Heat" / "Heat.mkv").touch()
+    config = cli.Config(
+        directories=cli.DirectoryConfig(movies_dir=movies_dir, clips_dir=tmp_path / "clips"),
+        settings=cli.Settings(cache_location=str(tmp_path / "cache")),
+    )
+    monkeypatch.setattr(cli.console, "print", lambda *_args, **_kwargs: None)
+    real_scandir = cli.os.scandir
+
+    def denied_scandir(path):
+        if Path(path).name == "Heat":
+            raise PermissionError(errno.EACCES, "Permission denied", str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(cli.os, "scandir", denied_scandir)
+    index = cli.find_movie_index(movies_dir, config.settings.video_extensions, config_value=config)
+    assert index.paths == []
+
+    # Fixing the permissions does not touch any mtime.
+    monkeypatch.setattr(cli.os, "scandir", real_scandir)
+    cache_data = cli.load_movie_cache(config)
+    cache_data["timestamp"] -= (config.settings.cache_ttl_hours + 1) * 3600
+    cli.save_movie_cache(cache_data, config)
+    index = cli.find_movie_index(movies_dir, config.settings.video_extensions, config_value=config)
+
+    assert index.paths == [movies_dir / "Heat" / "Heat.mkv"]
+
+
 def test_is_cache_valid_rejects_empty(tmp_path):
     config = make_config(tmp_path)
     assert cli.is_cache_valid({}, config.directories.movies_dir, config) is False
 
 
-def test_iter_movie_files_warns_once_on_permission_error(monkeypatch, tmp_path):
+@pytest.mark.parametrize(("same_path", "expected_warnings"), [(True, 1), (False, 2)])
+def test_iter_movie_files_warns_once_per_denied_path(
+    monkeypatch, tmp_path, same_path, expected_warnings
+):
     movies_dir = tmp_path / "movies"
     movies_dir.mkdir()
-    (movies_dir / "ok.mkv").write_text("data", encoding="utf-8")
+    (movies_dir / "ok.mkv").touch()
+    (movies_dir / "locked-a").mkdir()
+    (movies_dir / "locked-b").mkdir()
     warnings = []
+    real_scandir = cli.os.scandir
 
     def fake_print(*args, **_kwargs):
         warnings.append(" ".join(str(arg) for arg in args))
 
-    def fake_walk(root, followlinks=None, onerror=None):
-        if onerror is not None:
-            onerror(PermissionError(errno.EACCES, "Permission denied", str(Path(root) / "secret")))
-            onerror(PermissionError(errno.EACCES, "Permission denied", str(Path(root) / "secret")))
-        yield str(root), [], ["ok.mkv"]
+    def fake_scandir(path):
+        if Path(path).name.startswith("locked"):
+            denied = movies_dir / "secret" if same_path else path
+            raise PermissionError(errno.EACCES, "Permission denied", str(denied))
+        return real_scandir(path)
 
     monkeypatch.setattr(cli.console, "print", fake_print)
-    monkeypatch.setattr(cli.os, "walk", fake_walk)
+    monkeypatch.setattr(cli.os, "scandir", fake_scandir)
 
-    movie_files = cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=True)
+    movie_files = list(cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=True))
 
     assert movie_files == [movies_dir / "ok.mkv"]
     warning_messages = [message for message in warnings if "Warning" in message]
-    assert len(warning_messages) == 1
-    assert "Permission denied" in warning_messages[0]
-    assert "secret" in warning_messages[0]
+    assert len(warning_messages) == expected_warnings
+    assert all("Permission denied" in message for message in warning_messages)
+
 
+def test_build_movie_cache_records_file_stats(monkeypatch, tmp_path):
+    movies_dir = tmp_path / "movies"
+    (movies_dir / "nested").mkdir(parents=True)
+    movie = movies_dir / "nested" / "Movie.MKV"
+    movie.write_text("data", encoding="utf-8")
+    (movies_dir / "notes.txt").touch()
+    monkeypatch.setattr(cli.console, "print", lambda *_args, **_kwargs: None)
+
+    cache_data = cli.build_movie_cache(movies_dir, [".mkv"], follow_symlinks=True)
+
+    assert cache_data["movies"] == {
+        "paths": [str(movie)],
+        "sizes": [4],
+        "mtimes": [movie.stat().st_mtime],
+        "stems": ["movie"],
+        "parents": ["nested"],
+    }
 
-def test_iter_movie_files_skips_symlinked_files(tmp_path):
+
+def test_build_movie_cache_handles_empty_library(monkeypatch, tmp_path):
     movies_dir = tmp_path / "movies"
     movies_dir.mkdir()
+    monkeypatch.setattr(cli.console, "print", lambda *_args, **_kwargs: None)
+
+    cache_data = cli.build_movie_cache(movies_dir, [".mkv"], follow_symlinks=True)
+
+    assert cache_data["movies"]["paths"] == []
+    assert cli._movie_index_from_cache(cache_data).paths == []
+
+
+def test_iter_movie_files_matches_extensions_case_insensitively(tmp_path):
+    movies_dir = tmp_path / "movies"
+    movies_dir.mkdir()
+    for name in ("Alien.MKV", "Heat.mp4", "Heat.srt", ".mkv", "Heat.mkv.nfo"):
+        (movies_dir / name).touch()
+
+    movie_files = list(cli.iter_movie_files(movies_dir, [".mkv", ".MP4"], follow_symlinks=True))
+
+    assert sorted(movie_files) == [movies_dir / "Alien.MKV", movies_dir / "Heat.mp4"]
+
+
+class FakeDirEntry:
+    def __init__(self, path, symlink=False):
+        self.path = str(path)
+        self.name = Path(path).name
+        self.symlink = symlink
+
+    def is_dir(self):
+        return False
+
+    def is_symlink(self):
+        return self.symlink
+
+
+class FakeScandir(list):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        return None
+
+
+def test_iter_movie_files_skips_symlinked_files(monkeypatch, tmp_path):
+    movies_dir = tmp_path / "movies"
     real_movie = movies_dir / "movie.mkv"
-    real_movie.write_text("data", encoding="utf-8")
     symlinked_movie = movies_dir / "movie-link.mkv"
+    entries = [FakeDirEntry(real_movie), FakeDirEntry(symlinked_movie, symlink=True)]
+    monkeypatch.setattr(cli.os, "scandir", lambda _path: FakeScandir(entries))
+
+    movie_files = list(cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=False))
+
+    assert movie_files == [real_movie]
+
+    movie_files = list(cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=True))
+
+    assert movie_files == [real_movie, symlinked_movie]
+
+
+def test_iter_movie_files_walks_linked_directories_once(tmp_path):
+    movies_dir = tmp_path / "movies"
+    (movies_dir / "Heat").mkdir(parents=True)
+    (movies_dir / "Heat" / "Heat.mkv").touch()
     try:
-        symlinked_movie.symlink_to(real_movie)
+        (movies_dir / "Heat" / "loop").symlink_to(movies_dir, target_is_directory=True)
+        (movies_dir / "Heat-link").symlink_to(movies_dir / "Heat", target_is_directory=True)
     except (OSError, NotImplementedError) as exc:
         pytest.skip(f"Symlinks not supported: {exc}")
 
-    movie_files = cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=False)
-
-    assert real_movie in movie_files
-    assert symlinked_movie not in movie_files
-
-    movie_files = cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=True)
+    movie_files = list(cli.iter_movie_files(movies_dir, [".mkv"], follow_symlinks=True))
 
-    assert real_movie in movie_files
-    assert symlinked_movie in movie_files
+    assert len(movie_files) == 1
+    assert movie_files[0].resolve() == (movies_dir / "Heat" / "Heat.mkv").resolve()
 
 
 def test_select_movie_file_expands_user_path(monkeypatch, tmp_path):
@@ -249,7 +513,7 @@ def test_select_movie_file_expands_user_path(monkeypatch, tmp_path):
     clips_dir.mkdir()
     movie_path = home / "Movies" / "Title.mkv"
     movie_path.parent.mkdir()
-    movie_path.write_text("data", encoding="utf-8")
+    movie_path.touch()
 
     monkeypatch.setenv("HOME", str(home))
     config = cli.Config(
@@ -259,14 +523,62 @@ def test_select_movie_file_expands_user_path(monkeypatch, tmp_path):
         )
     )
 
-    def fail_find_movie_files(*_args, **_kwargs):
+    def fail_find_movie_index(*_args, **_kwargs):
         raise AssertionError("Unexpected search")
 
-    monkeypatch.setattr(cli, "find_movie_files", fail_find_movie_files)
+    monkeypatch.setattr(cli, "find_movie_index", fail_find_movie_index)
 
     assert cli.select_movie_file("~/Movies/Title.mkv", config) == movie_path
 
 
+def test_select_movie_file_skips_missing_cached_matches(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    movies_dir = config.directories.movies_dir
+    existing = movies_dir / "Alien.1979.mkv"
+    existing.touch()
+    missing = movies_dir / "Alien.mkv"
+
+    monkeypatch.setattr(
+        cli,
+        "find_movie_index",
+        lambda *_args, **_kwargs: cli.MovieIndex.from_paths([missing, existing]),
+    )
+
+    assert cli.select_movie_file("Alien", config) == existing
+
+
+def test_save_movie_cache_round_trips(monkeypatch, tmp_path):
+    movies_dir = tmp_path / "movies"
+    clips_dir = tmp_path / "clips"
+    movies_dir.mkdir()
+    config = cli.Config(
+        directories=cli.DirectoryConfig(movies_dir=movies_dir, clips_dir=clips_dir),
+        settings=cli.Settings(cache_location=str(tmp_path / "cache")),
+    )
+    monkeypatch.setattr(cli, "load_config", lambda: config)
+    cache_data = make_cache_data(movies_dir, config)
+
+    cli.save_movie_cache(cache_data, config)
+
+    cache_path = cli.get_cache_path(config)
+    assert cli.load_movie_cache() == cache_data
+    assert "\n" not in cache_path.read_text(encoding="utf-8")
+    assert list(cache_path.parent.iterdir()) == [cache_path]
+
+
+def test_load_movie_cache_without_orjson(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    config.settings.cache_location = str(tmp_path / "cache")
+    monkeypatch.setattr(cli, "orjson", None)
+    cache_data = make_cache_data(config.directories.movies_dir, config)
+
+    cli.save_movie_cache(cache_data, config)
+
+    assert cli.load_movie_cache(config) == cache_data
+    cli.get_cache_path(config).write_text("{not json", encoding="utf-8")
+    assert cli.load_movie_cache(config) is None
+
+
 def test_main_uses_config_default_for_preserve_audio(monkeypatch, tmp_path):
     movies_dir = tmp_path / "movies"
     clips_dir = tmp_path / "clips"
@@ -279,19 +591,7 @@ def test_main_uses_config_default_for_preserve_audio(monkeypatch, tmp_path):
         ),
         settings=cli.Settings(preserve_all_audio=True),
     )
-
-    def fake_load_config():
-        return config
-
-    def fake_check_ffmpeg(*_args, **_kwargs):
-        return cli.FfmpegTools(ffmpeg=Path("/usr/bin/ffmpeg"), ffprobe=None)
-
-    def fake_select_movie_file(*_args, **_kwargs):
-        return tmp_path / "movie.mkv"
-
-    monkeypatch.setattr(cli, "load_config", fake_load_config)
-    monkeypatch.setattr(cli, "check_ffmpeg", fake_check_ffmpeg)
-    monkeypatch.setattr(cli, "select_movie_file", fake_select_movie_file)
+    patch_main(monkeypatch, config, tmp_path / "movie.mkv")
 
     captured = {}
 
@@ -306,27 +606,209 @@ def test_main_uses_config_default_for_preserve_audio(monkeypatch, tmp_path):
         audio_lang,
         stereo,
         config_value,
+        audio_copy,
+        reencode,
+        video_encoder,
+        threads,
     ):
         captured["preserve_audio"] = preserve_audio
         return ["ffmpeg"]
 
+    def fake_execute_ffmpeg(command, duration_seconds):
+        captured["command"] = command
+        return True
+
     monkeypatch.setattr(cli, "build_ffmpeg_command", fake_build_ffmpeg_command)
-    monkeypatch.setattr(cli.Confirm, "ask", lambda *_args, **_kwargs: False)
-
-    runner = CliRunner()
-    result = runner.invoke(
-        cli.main,
-        [
-            "--start",
-            "0",
-            "--duration",
-            "10",
-            "movie.mkv",
-        ],
+    monkeypatch.setattr(cli, "execute_ffmpeg", fake_execute_ffmpeg)
+
+    # Called without CliRunner: nothing is read from the output, and errors propagate.
+    # --yes keeps the confirmation prompt away from the developer's terminal.
+    cli.main.main(["--start", "0", "--duration", "10", "--yes", "movie.mkv"], standalone_mode=False)
+
+    assert captured["preserve_audio"] is True
+    assert captured["command"] == ["ffmpeg"]
+
+
+def test_execute_ffmpeg_reports_log_tail_on_failure(monkeypatch):
+    printed = []
+    monkeypatch.setattr(cli.console, "print", lambda *args, **_kwargs: printed.extend(args))
+    script = (
+        "import sys\n"
+        "for i in range(100):\n"
+        "    sys.stderr.write(f'frame={i} time=00:00:0{i % 10}.00\\r')\n"
+        "sys.stderr.write('Invalid data found\\n')\n"
+        "sys.exit(1)\n"
     )
 
+    assert cli.execute_ffmpeg([sys.executable, "-c", script], duration_seconds=10) is False
+
+    error = printed[-1]
+    assert error.endswith("Invalid data found")
+    assert "frame=99" in error
+    assert "frame=0 " not in error
+
+
+def test_ensure_dir_creates_directory_once(monkeypatch, tmp_path):
+    output_dir = tmp_path / "clips_testing"
+    calls = []
+    original_mkdir = Path.mkdir
+
+    def counting_mkdir(path, *args, **kwargs):
+        calls.append(path)
+        return original_mkdir(path, *args, **kwargs)
+
+    monkeypatch.setattr(cli, "_ensured_dirs", set())
+    monkeypatch.setattr(Path, "mkdir", counting_mkdir)
+
+    cli._ensure_dir(output_dir)
+    cli._ensure_dir(output_dir)
+
+    assert output_dir.is_dir()
+    assert calls == [output_dir]
+
+
+def test_drop_page_cache_ignores_missing_file(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"data")
+
+    cli._drop_page_cache(clip)
+    cli._drop_page_cache(tmp_path / "missing.mp4")
+
+    assert clip.read_bytes() == b"data"
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise is unavailable")
+def test_prefetch_movie_ranges_estimates_offsets(monkeypatch, tmp_path):
+    movie = tmp_path / "movie.mkv"
+    movie.write_bytes(b"x" * 1000)
+    advised = []
+
+    def fake_run(command, **_kwargs):
+        return subprocess.CompletedProcess(command, 0, stdout="100.0\n", stderr="")
+
+    monkeypatch.setattr(cli.subprocess, "run", fake_run)
+    monkeypatch.setattr(
+        cli.os,
+        "posix_fadvise",
+        lambda _fd, offset, length, advice: advised.append((offset, length)),
+    )
+
+    cli._prefetch_movie_ranges(movie, Path("/usr/bin/ffprobe"), [(5, 10), (50, 10)])
+
+    # 10 bytes per second, starting PREFETCH_LEAD_SECONDS early and reading 20% extra.
+    assert advised == [(0, 170), (400, 220)]
+
+
+def test_run_ffmpeg_does_not_share_stdin(monkeypatch):
+    popen_kwargs = []
+    real_popen = cli.subprocess.Popen
+
+    def recording_popen(command, **kwargs):
+        popen_kwargs.append(kwargs)
+        return real_popen(command, **kwargs)
+
+    monkeypatch.setattr(cli.subprocess, "Popen", recording_popen)
+
+    returncode, _ = cli._run_ffmpeg([sys.executable, "-c", "pass"])
+
+    assert returncode == 0
+    assert popen_kwargs[0]["stdin"] is subprocess.DEVNULL
+
+
+def test_execute_ffmpeg_succeeds(monkeypatch):
+    monkeypatch.setattr(cli.console, "print", lambda *_args, **_kwargs: None)
+
+    assert cli.execute_ffmpeg([sys.executable, "-c", "pass"], duration_seconds=10) is True
+
+
+def test_main_cache_info_prints_summary(monkeypatch, cli_runner):
+    info = {
+        "exists": True,
+        "path": "/cache/movie_index.json",
+        "movies_count": 3,
+        "age_hours": 1.25,
+        "movies_dir": "/movies",
+        "size_bytes": 2048,
+    }
+    monkeypatch.setattr(cli, "get_cache_info", lambda: info)
+
+    result = cli_runner.invoke(cli.main, ["--cache-info"])
+
     assert result.exit_code == 0
-    assert captured["preserve_audio"] is True
+    assert result.output.splitlines() == [
+        "Cache Information:",
+        "  Path: /cache/movie_index.json",
+        "  Movies: 3",
+        "  Age: 1.2 hours",
+        "  Size: 2.0 KB",
+        "  Movies Directory: /movies",
+    ]
+
+
+def test_get_cache_info_reports_outdated_cache(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    config.settings.cache_location = str(tmp_path / "cache")
+    monkeypatch.setattr(cli, "load_config", lambda: config)
+    cache_path = cli.get_cache_path(config)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(
+        '{"timestamp": 0, "movies": [{"path": "/movies/Heat.mkv"}]}',
+        encoding="utf-8",
+    )
+
+    info = cli.get_cache_info()
+
+    assert info == {"exists": True, "outdated": True, "path": str(cache_path)}
+
+
+def test_main_cache_info_reports_outdated_cache(monkeypatch, cli_runner):
+    info = {"exists": True, "outdated": True, "path": "/cache/movie_index.json"}
+    monkeypatch.setattr(cli, "get_cache_info", lambda: info)
+
+    result = cli_runner.invoke(cli.main, ["--cache-info"])
+
+    assert result.exit_code == 0
+    assert "outdated" in result.output
+    assert "No cache found" not in result.output
+
+
+class FakeStdin:
+    def __init__(self, tty):
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+class InlineThread:
+    """Run a thread's target on start() so tests do not race it."""
+
+    def __init__(self, target, daemon):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@pytest.mark.parametrize(
+    ("assume_yes", "tty", "asked"),
+    [(False, True, True), (True, True, False), (False, False, False)],
+)
+def test_confirm_clipping_prompts_only_on_terminal(monkeypatch, assume_yes, tty, asked):
+    questions = []
+
+    def fake_ask(question, **_kwargs):
+        questions.append(question)
+        return False
+
+    monkeypatch.setattr(cli.sys, "stdin", FakeStdin(tty))
+    monkeypatch.setattr(cli.Confirm, "ask", fake_ask)
+    monkeypatch.setattr(cli.threading, "Thread", InlineThread)
+    waited = []
+
+    assert cli._confirm_clipping(assume_yes, lambda: waited.append(True)) is not asked
+    assert bool(questions) is asked
+    assert bool(waited) is asked
 
 
 def test_select_audio_stream_prefers_exact_language():
@@ -348,16 +830,91 @@ def test_select_audio_stream_returns_none_for_empty():
     assert cli.select_audio_stream([], "eng") is None
 
 
-def test_build_ffmpeg_command_audio_selection(monkeypatch, tmp_path):
+def test_detect_audio_streams_reuses_cached_probe(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    config.settings.cache_location = str(tmp_path / "cache")
+    movie_file = config.directories.movies_dir / "movie.mkv"
+    movie_file.write_text("data", encoding="utf-8")
+    calls = []
+
+    def fake_run(command, **_kwargs):
+        calls.append(command)
+        stdout = '{"streams": [{"index": 1, "codec_name": "aac", "tags": {"language": "eng"}}]}'
+        return subprocess.CompletedProcess(command, 0, stdout=stdout)
+
+    monkeypatch.setattr(cli.subprocess, "run", fake_run)
+
+    first = cli.detect_audio_streams(movie_file, Path("/usr/bin/ffprobe"), config)
+    second = cli.detect_audio_streams(movie_file, Path("/usr/bin/ffprobe"), config)
+
+    assert second == first
+    assert first[0]["language"] == "eng"
+    assert len(calls) == 1
+    assert "-show_entries" in calls[0]
+
+    movie_file.write_text("new data", encoding="utf-8")
+    cli.detect_audio_streams(movie_file, Path("/usr/bin/ffprobe"), config)
+    assert len(calls) == 2
+
+
+def test_save_probe_cache_drops_stale_entries(tmp_path):
+    current = tmp_path / "current.mkv"
+    rewritten = tmp_path / "rewritten.mkv"
+    current.write_text("data", encoding="utf-8")
+    rewritten.write_text("data", encoding="utf-8")
+
+    def entry(path):
+        stat = path.stat()
+        return {"size": stat.st_size, "mtime": stat.st_mtime, "streams": []}
+
+    cache_data = {
+        str(current): entry(current),
+        str(rewritten): entry(rewritten),
+        str(tmp_path / "deleted.mkv"): {"size": 4, "mtime": 0.0, "streams": []},
+    }
+    rewritten.write_text("new data", encoding="utf-8")
+    cache_path = tmp_path / "ffprobe_cache.json"
+
+    cli._save_probe_cache(cache_path, cache_data)
+
+    assert list(cli._load_probe_cache(cache_path)) == [str(current)]
+
+
+def test_invalidate_movie_cache_removes_probe_cache(monkeypatch, tmp_path):
     config = make_config(tmp_path)
+    config.settings.cache_location = str(tmp_path / "cache")
     monkeypatch.setattr(cli, "load_config", lambda: config)
-    monkeypatch.setattr(
-        cli,
-        "detect_audio_streams",
-        lambda movie_file, ffprobe_path: [
-            {"index": 1, "language": "eng", "channels": 2, "stream_index": 2}
-        ],
-    )
+    cache_path = cli.get_cache_path(config)
+    probe_cache_path = cli._probe_cache_path(config)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text("{}", encoding="utf-8")
+    probe_cache_path.write_text("{}", encoding="utf-8")
+
+    cli.invalidate_movie_cache()
+
+    assert not cache_path.exists()
+    assert not probe_cache_path.exists()
+
+
+ENGLISH_STREAM = {"index": 1, "language": "eng", "channels": 2, "stream_index": 2}
+SPANISH_STREAM = {"index": 0, "language": "spa", "channels": 2, "stream_index": 0}
+UNKNOWN_STREAM = {"index": 0, "language": "unknown", "channels": 2, "stream_index": 0}
+
+
+@pytest.mark.parametrize(
+    ("streams", "preserve_audio", "audio_lang", "stereo", "audio_map"),
+    [
+        ([ENGLISH_STREAM], False, "eng", True, "0:a:1"),
+        # Without --audio-lang the configured default language is picked.
+        ([SPANISH_STREAM, ENGLISH_STREAM], False, None, True, "0:a:1"),
+        ([UNKNOWN_STREAM], True, None, False, "0:a?"),
+    ],
+)
+def test_build_ffmpeg_command_audio_selection(
+    monkeypatch, tmp_path, streams, preserve_audio, audio_lang, stereo, audio_map
+):
+    config = make_config(tmp_path)
+    monkeypatch.setattr(cli, "detect_audio_streams", lambda *_args: streams)
 
     command = cli.build_ffmpeg_command(
         movie_file=tmp_path / "movie.mkv",
@@ -365,31 +922,48 @@ def test_build_ffmpeg_command_audio_selection(monkeypatch, tmp_path):
         duration_seconds=10,
         output_file=tmp_path / "out.mp4",
         ffmpeg_path=Path("/usr/bin/ffmpeg"),
-        ffprobe_path=None,
-        preserve_audio=False,
-        audio_lang="eng",
-        stereo=True,
+        ffprobe_path=Path("/usr/bin/ffprobe"),
+        preserve_audio=preserve_audio,
+        audio_lang=audio_lang,
+        stereo=stereo,
         config_value=config,
     )
 
+    settings = config.settings
+    maps = [command[index + 1] for index, item in enumerate(command) if item == "-map"]
     assert command[0] == "/usr/bin/ffmpeg"
-    assert "-map" in command
-    assert "0:a:1" in command
-    assert "-ac" in command
-    assert str(config.settings.default_audio_channels) in command
+    assert maps == ["0:v:0", audio_map]
+    assert ("-ac" in command) is stereo
+    if stereo:
+        assert command[command.index("-ac") + 1] == str(settings.default_audio_channels)
+    assert command[command.index("-c:a") + 1] == settings.default_audio_codec
+    assert command[command.index("-ar") + 1] == str(settings.default_sample_rate)
 
 
-def test_build_ffmpeg_command_selects_default_language(monkeypatch, tmp_path):
+@pytest.mark.parametrize(
+    ("stream_update", "stereo", "copies"),
+    [
+        ({}, True, True),
+        ({"channels": 6}, True, False),
+        ({"channels": 6}, False, True),
+        ({"sample_rate": "44100"}, True, False),
+        ({"codec_name": "aac"}, True, False),
+    ],
+)
+def test_build_ffmpeg_command_copies_compatible_audio(
+    monkeypatch, tmp_path, stream_update, stereo, copies
+):
     config = make_config(tmp_path)
-    monkeypatch.setattr(cli, "load_config", lambda: config)
-    monkeypatch.setattr(
-        cli,
-        "detect_audio_streams",
-        lambda movie_file, ffprobe_path: [
-            {"index": 0, "language": "spa", "channels": 2, "stream_index": 0},
-            {"index": 1, "language": "eng", "channels": 2, "stream_index": 1},
-        ],
-    )
+    stream = {
+        "index": 0,
+        "codec_name": "pcm_s16le",
+        "channels": 2,
+        "sample_rate": "48000",
+        "language": "eng",
+        "stream_index": 1,
+    }
+    stream.update(stream_update)
+    monkeypatch.setattr(cli, "detect_audio_streams", lambda *_args: [stream])
 
     command = cli.build_ffmpeg_command(
         movie_file=tmp_path / "movie.mkv",
@@ -398,21 +972,17 @@ def test_build_ffmpeg_command_selects_default_language(monkeypatch, tmp_path):
         output_file=tmp_path / "out.mp4",
         ffmpeg_path=Path("/usr/bin/ffmpeg"),
         ffprobe_path=Path("/usr/bin/ffprobe"),
-        preserve_audio=False,
-        audio_lang=None,
-        stereo=True,
+        stereo=stereo,
         config_value=config,
     )
 
-    map_indices = [i for i, item in enumerate(command) if item == "-map"]
-    assert command[map_indices[0] + 1] == "0:v:0"
-    assert command[map_indices[1] + 1] == "0:a:1"
-    assert "-ac" in command
+    codec = command[command.index("-c:a") + 1]
+    assert (codec == "copy") is copies
+    assert ("-ar" not in command) is copies
 
 
-def test_build_ffmpeg_command_preserve_audio_no_stereo(monkeypatch, tmp_path):
+def test_build_ffmpeg_command_audio_copy_flag(tmp_path):
     config = make_config(tmp_path)
-    monkeypatch.setattr(cli, "load_config", lambda: config)
 
     command = cli.build_ffmpeg_command(
         movie_file=tmp_path / "movie.mkv",
@@ -422,24 +992,384 @@ def test_build_ffmpeg_command_preserve_audio_no_stereo(monkeypatch, tmp_path):
         ffmpeg_path=Path("/usr/bin/ffmpeg"),
         ffprobe_path=None,
         preserve_audio=True,
-        audio_lang=None,
-        stereo=False,
+        stereo=True,
         config_value=config,
+        audio_copy=True,
     )
 
-    map_indices = [i for i, item in enumerate(command) if item == "-map"]
-    mapped_streams = {command[index + 1] for index in map_indices}
-    assert mapped_streams == {"0:v:0", "0:a?"}
+    assert command[command.index("-c:a") + 1] == "copy"
     assert "-ac" not in command
-    assert "-c:a" in command
-    assert str(config.settings.default_sample_rate) in command
+
+
+def test_build_ffmpeg_command_seeks_before_input(tmp_path):
+    config = make_config(tmp_path)
+    movie_file = tmp_path / "movie.mkv"
+
+    command = cli.build_ffmpeg_command(
+        movie_file=movie_file,
+        start_seconds=Decimal("90.5"),
+        duration_seconds=10,
+        output_file=tmp_path / "out.mp4",
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=None,
+        config_value=config,
+    )
+
+    assert command[2:8] == ["-ss", "00:01:30.5", "-t", "00:00:10", "-i", str(movie_file)]
+    assert command[-3:] == ["-avoid_negative_ts", "make_zero", f"file:{tmp_path / 'out.mp4'}"]
+
+
+def test_ffmpeg_arguments_reach_the_process_verbatim(tmp_path):
+    config = make_config(tmp_path)
+    movie_file = tmp_path / 'It\'s $HOME; "Heat" (1995).mkv'
+
+    command = cli.build_ffmpeg_command(
+        movie_file=movie_file,
+        start_seconds=0,
+        duration_seconds=10,
+        output_file=tmp_path / "out.mp4",
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=None,
+        config_value=config,
+    )
+
+    assert all(isinstance(argument, str) for argument in command)
+    assert str(movie_file) in command
+
+    # No shell runs in between, so nothing needs quoting.
+    check = "import sys; sys.exit(sys.argv[1] != sys.argv[2])"
+    returncode, _ = cli._run_ffmpeg([sys.executable, "-c", check, str(movie_file), str(movie_file)])
+    assert returncode == 0
+
+
+def test_build_ffmpeg_command_reencode(tmp_path):
+    config = make_config(tmp_path)
+
+    command = cli.build_ffmpeg_command(
+        movie_file=tmp_path / "movie.mkv",
+        start_seconds=90,
+        duration_seconds=10,
+        output_file=tmp_path / "out.mp4",
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=None,
+        config_value=config,
+        reencode=True,
+    )
+
+    assert command[command.index("-c:v") + 1] == cli.REENCODE_VIDEO_CODEC
+    assert command.index("-ss") < command.index("-i")
+    assert "-avoid_negative_ts" not in command
+
+
+def test_read_segments_file(tmp_path):
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text(
+        "# start duration name\n00:01:00 10\n\n1:30:00 00:00:05.5 Final scene\n",
+        encoding="utf-8",
+    )
+
+    assert cli.read_segments_file(segments_path) == [
+        cli.ClipSegment(Decimal("60"), Decimal("10")),
+        cli.ClipSegment(Decimal("5400"), Decimal("5.5"), "Final scene"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("00:01:00\n", "line 1: expected START DURATION"),
+        ("# only comments\n", "no segments found"),
+        ("0 10\n0 xx\n", "line 2: "),
+        ("0 10 ../escape\n", "line 1: clip name must not contain a path"),
+    ],
+)
+def test_read_segments_file_rejects_invalid_lines(tmp_path, content, message):
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match=message):
+        cli.read_segments_file(segments_path)
+
+
+def test_build_ffmpeg_batch_commands_maps_each_input(monkeypatch, tmp_path):
+    config = make_config(tmp_path)
+    movie_file = tmp_path / "movie.mkv"
+    monkeypatch.setattr(
+        cli,
+        "detect_audio_streams",
+        lambda *_args: [{"index": 1, "language": "eng", "channels": 2, "stream_index": 2}],
+    )
+    clips = [
+        (0, 10, tmp_path / "first.mp4"),
+        (60, 5, tmp_path / "second.mp4"),
+    ]
+
+    [command] = cli.build_ffmpeg_batch_commands(
+        movie_file,
+        [clips],
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=Path("/usr/bin/ffprobe"),
+        config_value=config,
+    )
+
+    assert command.count("-i") == 2
+    assert command.index("00:01:00") < command.index(f"file:{tmp_path / 'first.mp4'}")
+    second_output = command[command.index(f"file:{tmp_path / 'first.mp4'}") + 1 :]
+    assert second_output[second_output.index("-map") + 1] == "1:v:0"
+    assert "1:a:1" in second_output
+    assert second_output[-1] == f"file:{tmp_path / 'second.mp4'}"
+
+
+def test_build_ffmpeg_batch_commands_limits_each_input(tmp_path):
+    config = make_config(tmp_path)
+    movie_file = tmp_path / "movie.mkv"
+    clips = [
+        (10, 5, tmp_path / "first.mp4"),
+        (100, 30, tmp_path / "second.mp4"),
+    ]
+
+    [command] = cli.build_ffmpeg_batch_commands(
+        movie_file,
+        [clips],
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=None,
+        config_value=config,
+    )
+
+    inputs = [index for index, item in enumerate(command) if item == "-i"]
+    assert [command[index - 4 : index] for index in inputs] == [
+        ["-ss", "00:00:10", "-t", "00:00:05"],
+        ["-ss", "00:01:40", "-t", "00:00:30"],
+    ]
+    # No -t is left after the last input, where it would cut the first output.
+    assert "-t" not in command[inputs[-1] :]
+
+
+def test_main_segments_runs_one_ffmpeg(monkeypatch, tmp_path, cli_runner):
+    config = make_config(tmp_path)
+    movie_file = config.directories.movies_dir / "Heat.mkv"
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text("90 5 Bank\n10 5\n", encoding="utf-8")
+    patch_main(monkeypatch, config, movie_file)
+    monkeypatch.setattr(cli.Confirm, "ask", lambda *_args, **_kwargs: True)
+    commands = []
+
+    def fake_execute_ffmpeg(command, duration_seconds):
+        commands.append((command, duration_seconds))
+        return True
+
+    monkeypatch.setattr(cli, "execute_ffmpeg", fake_execute_ffmpeg)
+
+    result = cli_runner.invoke(cli.main, ["Heat", "--segments", str(segments_path)])
+
+    assert result.exit_code == 0, result.output
+    assert len(commands) == 1
+    command, duration_seconds = commands[0]
+    clips_dir = config.directories.clips_dir
+    outputs = [item for item in command if item.endswith(".mp4")]
+    assert outputs == [
+        f"file:{clips_dir / 'Heat_00h00m10s_to_00h00m15s.mp4'}",
+        f"file:{clips_dir / 'Bank.mp4'}",
+    ]
+    assert duration_seconds == 5
+
+
+def test_main_segments_splits_clips_across_jobs(monkeypatch, tmp_path, cli_runner):
+    config = make_config(tmp_path)
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text("0 5\n10 20\n30 5\n", encoding="utf-8")
+    patch_main(monkeypatch, config, config.directories.movies_dir / "Heat.mkv")
+    monkeypatch.setattr(cli.Confirm, "ask", lambda *_args, **_kwargs: True)
+    captured = {}
+
+    def fake_execute_ffmpeg_jobs(jobs, max_workers):
+        captured["jobs"] = jobs
+        captured["max_workers"] = max_workers
+        return True
+
+    monkeypatch.setattr(cli, "execute_ffmpeg_jobs", fake_execute_ffmpeg_jobs)
+
+    result = cli_runner.invoke(cli.main, ["Heat", "--segments", str(segments_path), "--jobs", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert captured["max_workers"] == 2
+    assert [command.count("-i") for command, _ in captured["jobs"]] == [2, 1]
+    assert [duration for _, duration in captured["jobs"]] == [5, 20]
+    for command, _ in captured["jobs"]:
+        assert command[command.index("-threads") + 1] == str(max(1, (os.cpu_count() or 1) // 2))
+
+
+def test_main_segments_shares_cores_between_running_jobs(monkeypatch, tmp_path, cli_runner):
+    config = make_config(tmp_path)
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text("0 5\n10 20\n", encoding="utf-8")
+    patch_main(monkeypatch, config, config.directories.movies_dir / "Heat.mkv")
+    monkeypatch.setattr(cli.Confirm, "ask", lambda *_args, **_kwargs: True)
+    monkeypatch.setattr(cli.os, "cpu_count", lambda: 8)
+    captured = {}
+
+    def fake_execute_ffmpeg_jobs(jobs, max_workers):
+        captured["jobs"] = jobs
+        captured["max_workers"] = max_workers
+        return True
+
+    monkeypatch.setattr(cli, "execute_ffmpeg_jobs", fake_execute_ffmpeg_jobs)
+
+    result = cli_runner.invoke(cli.main, ["Heat", "--segments", str(segments_path), "--jobs", "8"])
+
+    assert result.exit_code == 0, result.output
+    assert captured["max_workers"] == 2
+    for command, _ in captured["jobs"]:
+        assert command[command.index("-threads") + 1] == "4"
+
+
+def test_main_segments_caps_clips_per_command(monkeypatch, tmp_path, cli_runner):
+    config = make_config(tmp_path)
+    segments_path = tmp_path / "segments.txt"
+    segment_count = cli.MAX_CLIPS_PER_COMMAND * 2 + 1
+    segments_path.write_text(
+        "".join(f"{index * 60} 5\n" for index in range(segment_count)), encoding="utf-8"
+    )
+    patch_main(monkeypatch, config, config.directories.movies_dir / "Heat.mkv")
+    monkeypatch.setattr(cli.Confirm, "ask", lambda *_args, **_kwargs: True)
+    captured = {}
+
+    def fake_execute_ffmpeg_jobs(jobs, max_workers):
+        captured["jobs"] = jobs
+        captured["max_workers"] = max_workers
+        return True
+
+    monkeypatch.setattr(cli, "execute_ffmpeg_jobs", fake_execute_ffmpeg_jobs)
+
+    result = cli_runner.invoke(cli.main, ["Heat", "--segments", str(segments_path)])
+
+    assert result.exit_code == 0, result.output
+    assert captured["max_workers"] == 1
+    assert [command.count("-i") for command, _ in captured["jobs"]] == [
+        cli.MAX_CLIPS_PER_COMMAND,
+        cli.MAX_CLIPS_PER_COMMAND,
+        1,
+    ]
+    assert all("-threads" not in command for command, _ in captured["jobs"])
+
+
+def test_execute_ffmpeg_jobs_reports_failed_job(monkeypatch):
+    printed = []
+    monkeypatch.setattr(cli.console, "print", lambda *args, **_kwargs: printed.extend(args))
+    succeed = [sys.executable, "-c", "pass"]
+    fail = [sys.executable, "-c", "import sys; sys.exit('broken input')"]
+
+    assert cli.execute_ffmpeg_jobs([(succeed, 5), (fail, 5)], max_workers=2) is False
+    assert cli.execute_ffmpeg_jobs([(succeed, 5), (succeed, 5)], max_workers=2) is True
+
+    errors = [message for message in printed if "FFmpeg error" in str(message)]
+    assert errors == ["[red]FFmpeg error (job 2):[/red] broken input"]
+
+
+def test_main_segments_rejects_start(tmp_path, cli_runner):
+    segments_path = tmp_path / "segments.txt"
+    segments_path.write_text("0 5\n", encoding="utf-8")
+
+    result = cli_runner.invoke(cli.main, ["Heat", "--segments", str(segments_path), "--start", "0"])
+
+    assert result.exit_code == 1
+    assert "cannot be combined" in result.output
+
+
+ENCODERS_OUTPUT = """Encoders:
+ V..... = Video
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V....D h264_vaapi           H.264/AVC (VAAPI) (codec h264)
+"""
+
+
+def fake_encoder_run(working):
+    def fake_run(command, **_kwargs):
+        if "-encoders" in command:
+            return subprocess.CompletedProcess(command, 0, stdout=ENCODERS_OUTPUT)
+        encoder = command[command.index("-c:v") + 1]
+        if encoder not in working:
+            raise subprocess.CalledProcessError(1, command)
+        return subprocess.CompletedProcess(command, 0)
+
+    return fake_run
+
+
+@pytest.mark.parametrize(
+    ("choice", "working", "expected"),
+    [
+        ("auto", {"h264_nvenc", "h264_vaapi"}, "h264_nvenc"),
+        ("auto", {"h264_vaapi"}, "h264_vaapi"),
+        ("auto", set(), "libx264"),
+        ("cpu", {"h264_nvenc"}, "libx264"),
+        ("vaapi", {"h264_vaapi"}, "h264_vaapi"),
+    ],
+)
+def test_resolve_video_encoder(monkeypatch, tmp_path, choice, working, expected):
+    monkeypatch.setattr(cli.subprocess, "run", fake_encoder_run(working))
+
+    assert cli.resolve_video_encoder(tmp_path / "ffmpeg", choice) == expected
+
+
+def test_resolve_video_encoder_rejects_unavailable_choice(monkeypatch, tmp_path):
+    monkeypatch.setattr(cli.subprocess, "run", fake_encoder_run({"h264_nvenc"}))
+    monkeypatch.setattr(cli.console, "print", lambda *_args, **_kwargs: None)
+
+    with pytest.raises(SystemExit):
+        cli.resolve_video_encoder(tmp_path / "ffmpeg", "qsv")
+
+
+def test_build_ffmpeg_command_vaapi_uploads_frames(tmp_path):
+    config = make_config(tmp_path)
+
+    command = cli.build_ffmpeg_command(
+        movie_file=tmp_path / "movie.mkv",
+        start_seconds=0,
+        duration_seconds=10,
+        output_file=tmp_path / "out.mp4",
+        ffmpeg_path=Path("/usr/bin/ffmpeg"),
+        ffprobe_path=None,
+        config_value=config,
+        reencode=True,
+        video_encoder="h264_vaapi",
+    )
+
+    assert command.index("-vaapi_device") < command.index("-i")
+    assert command[command.index("-c:v") + 1] == "h264_vaapi"
+    assert command[command.index("-vf") + 1] == "format=nv12,hwupload"
+
+
+def test_build_ffmpeg_command_threads(tmp_path):
+    config = make_config(tmp_path)
+
+    def build(threads):
+        return cli.build_ffmpeg_command(
+            movie_file=tmp_path / "movie.mkv",
+            start_seconds=0,
+            duration_seconds=10,
+            output_file=tmp_path / "out.mp4",
+            ffmpeg_path=Path("/usr/bin/ffmpeg"),
+            ffprobe_path=None,
+            config_value=config,
+            reencode=True,
+            threads=threads,
+        )
+
+    assert "-threads" not in build(None)
+    command = build(4)
+    assert command[command.index("-threads") + 1] == "4"
+    assert command.index("-threads") > command.index("-i")
+    assert command[command.index("-filter_threads") + 1] == "4"
+    assert command[command.index("-filter_complex_threads") + 1] == "4"
 
 
 def test_resolve_ffmpeg_tools_env(monkeypatch, tmp_path):
     ffmpeg_path = tmp_path / "ffmpeg"
     ffprobe_path = tmp_path / "ffprobe"
-    ffmpeg_path.write_text("")
-    ffprobe_path.write_text("")
+    ffmpeg_path.touch()
+    ffprobe_path.touch()
     ffmpeg_path.chmod(0o755)
     ffprobe_path.chmod(0o755)
 
@@ -452,26 +1382,25 @@ def test_resolve_ffmpeg_tools_env(monkeypatch, tmp_path):
     assert tools.ffprobe == ffprobe_path
 
 
-def test_default_directories_prefers_existing_home(monkeypatch, tmp_path):
-    home = tmp_path / "home"
-    videos = home / "Videos"
-    videos.mkdir(parents=True)
-
-    monkeypatch.setattr(cli.Path, "home", lambda: home)
-    monkeypatch.setattr(cli.Path, "cwd", lambda: tmp_path)
-
-    movies_dir, clips_dir = cli.default_directories()
-    assert movies_dir == videos
-    assert clips_dir == videos / "clips"
-
-
-def test_default_directories_falls_back_to_cwd(monkeypatch, tmp_path):
+@pytest.mark.parametrize(
+    ("folders", "expected_root"),
+    [
+        (["Videos"], "home/Videos"),
+        (["Movies"], "home/Movies"),
+        (["Videos", "Movies"], "home/Videos"),
+        # Without either folder in the home directory, the current directory is used.
+        ([], "."),
+    ],
+)
+def test_default_directories(monkeypatch, tmp_path, folders, expected_root):
     home = tmp_path / "home"
     home.mkdir()
+    for folder in folders:
+        (home / folder).mkdir()
 
     monkeypatch.setattr(cli.Path, "home", lambda: home)
     monkeypatch.setattr(cli.Path, "cwd", lambda: tmp_path)
 
     movies_dir, clips_dir = cli.default_directories()
-    assert movies_dir == tmp_path
-    assert clips_dir == tmp_path / "clips"
+    assert movies_dir == tmp_path / expected_root
+    assert clips_dir == tmp_path / expected_root / "clips"